@@ -0,0 +1,90 @@
+"""
+Per-user sets of favorited product IDs, kept in the cache.
+
+Catalog listings are cached per audience, not per user, so ``mark_favorited`` adds the
+``is_favorited`` flag to each product after the cached payload is read; with the set
+already cached that costs no queries.
+
+``favorite_count`` changes with every click on the heart, so it is not allowed to
+invalidate the cached listings either. Each product's count is cached under its own
+key, which the favorite signals drop, and ``apply_counts`` writes the current counts
+over a cached payload.
+"""
+from django.core.cache import cache
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from products.models import Product
+
+from .models import Favorite
+
+
+FAVORITES_TTL = 60 * 60 * 24
+FAVORITES_KEY = 'favorites:{}'
+COUNT_KEY = 'favorites:count:{}'
+
+
+def favorite_ids(user):
+    """Set of product IDs ``user`` has favorited."""
+    if user is None or not user.is_authenticated:
+        return frozenset()
+    key = FAVORITES_KEY.format(user.pk)
+    ids = cache.get(key)
+    if ids is None:
+        ids = frozenset(Favorite.objects.filter(user=user).values_list('product_id', flat=True))
+        cache.set(key, ids, FAVORITES_TTL)
+    return ids
+
+
+def invalidate(user_id):
+    cache.delete(FAVORITES_KEY.format(user_id))
+
+
+def listed_products(data):
+    """The products of a list or paginated response payload."""
+    return data.get('results', []) if isinstance(data, dict) else data
+
+
+def mark_favorited(data, user):
+    """Set ``is_favorited`` on every product in a list or paginated response payload."""
+    ids = favorite_ids(user)
+    for product in listed_products(data):
+        product['is_favorited'] = product['id'] in ids
+
+
+def invalidate_count(product_id):
+    cache.delete(COUNT_KEY.format(product_id))
+
+
+def apply_counts(data, fresh=False):
+    """
+    Bring ``favorite_count`` in a list payload up to date.
+
+    A ``fresh`` payload was just built from the database and seeds the per-product
+    counts; a cached one gets them overlaid, loading only the uncached ones.
+    """
+    products = listed_products(data)
+    if fresh:
+        cache.set_many(
+            {COUNT_KEY.format(product['id']): product['favorite_count'] for product in products}, FAVORITES_TTL
+        )
+        return
+    keys = {product['id']: COUNT_KEY.format(product['id']) for product in products}
+    cached = cache.get_many(keys.values())
+    counts = {product_id: cached[key] for product_id, key in keys.items() if key in cached}
+    missing = keys.keys() - counts.keys()
+    if missing:
+        loaded = dict(Product.objects.filter(pk__in=missing).values_list('pk', 'favorite_count'))
+        cache.set_many({keys[product_id]: count for product_id, count in loaded.items()}, FAVORITES_TTL)
+        counts.update(loaded)
+    for product in products:
+        product['favorite_count'] = counts.get(product['id'], product['favorite_count'])
+
+
+def rebuild_counts(queryset=None):
+    """Recompute ``Product.favorite_count`` from the favorites table."""
+    queryset = Product.objects.all() if queryset is None else queryset
+    counts = Favorite.objects.filter(product=OuterRef('pk')).order_by().values('product').annotate(
+        total=Count('id')
+    ).values('total')
+    return queryset.update(favorite_count=Coalesce(Subquery(counts), 0))
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from orders.models import Order
 from products.models import Product
@@ -77,6 +78,23 @@ class Favorite(models.Model):
     def __str__(self):
         return f"{self.user.email} - {self.product.title}"
 
+class UserProfileQuerySet(models.QuerySet):
+    def with_order_summary(self):
+        """
+        Annotate ``order_count`` and the newest order's id, date, status and total as
+        correlated subqueries, so the profile and its order summary load in one query.
+        """
+        orders = Order.objects.filter(user=OuterRef('user')).order_by()
+        latest = orders.order_by('-created_at', '-id')
+        return self.select_related('user').annotate(
+            order_count=Subquery(orders.values('user').annotate(count=Count('id')).values('count')),
+            last_order_id=Subquery(latest.values('id')[:1]),
+            last_order_created_at=Subquery(latest.values('created_at')[:1]),
+            last_order_status=Subquery(latest.values('payment_status')[:1]),
+            last_order_total=Subquery(latest.values('total')[:1]),
+        )
+
+
 class UserProfile(models.Model):
     user = models.OneToOneField(UserAccount, on_delete=models.CASCADE, related_name='userprofile')
     bio = models.TextField(blank=True)
@@ -84,7 +102,8 @@ class UserProfile(models.Model):
     location = models.CharField(max_length=255, blank=True)
     birth_date = models.DateField(null=True, blank=True)
 
-    
+    objects = UserProfileQuerySet.as_manager()
+
     def get_orders(self):
         return Order.objects.filter(user=self.user)
 
@@ -2,10 +2,8 @@ from rest_framework import serializers
 from djoser.serializers import UserCreateSerializer
 from .models import UserAccount, UserProfile, Favorite
 from django.contrib.auth import get_user_model
-from orders.serializers import OrderSerializer
-from products.serializers import ProductSerializer
+from products.serializers import ProductCardSerializer
 from products.models import Product
-from orders.models import Order
 User = get_user_model()
 
 
@@ -27,21 +25,43 @@ class CustomUserSerializer(UserSerializer):
         fields = ('id', 'email', 'name', 'date_joined')
 
 class FavoriteSerializer(serializers.ModelSerializer):
-    user = CustomUserSerializer(read_only=True)
-    product = ProductSerializer(read_only=True)
+    product = ProductCardSerializer(read_only=True)
+    product_id = serializers.PrimaryKeyRelatedField(
+        queryset=Product.objects.all(), source='product', write_only=True
+    )
 
     class Meta:
         model = Favorite
-        fields = ('id', 'user', 'product')
+        fields = ('id', 'user', 'product', 'product_id', 'created_at')
+        read_only_fields = ('user', 'created_at')
+
+    # Named after the writable field; DRF looks validators up by field name, not source.
+    def validate_product_id(self, product):
+        user = self.context['request'].user
+        if Favorite.objects.filter(user=user, product=product).exists():
+            raise serializers.ValidationError("This product is already in your favorites.")
+        return product
 
 class UserProfileSerializer(serializers.ModelSerializer):
     user = CustomUserSerializer(read_only=True)
-    orders = serializers.SerializerMethodField()
+    order_count = serializers.SerializerMethodField()
+    last_order = serializers.SerializerMethodField()
+
     class Meta:
         model = UserProfile
-        fields = ('user', 'bio', 'picture', 'location', 'birth_date', 'orders')
+        fields = ('user', 'bio', 'picture', 'location', 'birth_date', 'order_count', 'last_order')
+
+    # Both read the annotations from UserProfile.objects.with_order_summary();
+    # the orders themselves are paged from users/me/orders/.
+    def get_order_count(self, obj):
+        return getattr(obj, 'order_count', None) or 0
 
-    def get_orders(self, obj):
-        orders = Order.objects.filter(user=obj.user)
-        return OrderSerializer(orders, many=True).data
-    
+    def get_last_order(self, obj):
+        if getattr(obj, 'last_order_id', None) is None:
+            return None
+        return {
+            'id': obj.last_order_id,
+            'created_at': serializers.DateTimeField().to_representation(obj.last_order_created_at),
+            'payment_status': obj.last_order_status,
+            'total': serializers.DecimalField(max_digits=12, decimal_places=2).to_representation(obj.last_order_total),
+        }
@@ -1,10 +1,30 @@
-from django.db.models.signals import post_save
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from .models import UserProfile
+from products.models import Product
+from .models import Favorite, UserProfile
+from . import favorites
 User = get_user_model()
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
-        UserProfile.objects.create(user=instance)
\ No newline at end of file
+        UserProfile.objects.create(user=instance)
+
+
+@receiver(post_save, sender=Favorite)
+def count_added_favorite(sender, instance, created, **kwargs):
+    if created:
+        Product.objects.filter(pk=instance.product_id).update(favorite_count=F('favorite_count') + 1)
+        favorites.invalidate_count(instance.product_id)
+    favorites.invalidate(instance.user_id)
+
+
+@receiver(post_delete, sender=Favorite)
+def count_removed_favorite(sender, instance, **kwargs):
+    Product.objects.filter(pk=instance.product_id, favorite_count__gt=0).update(
+        favorite_count=F('favorite_count') - 1
+    )
+    favorites.invalidate_count(instance.product_id)
+    favorites.invalidate(instance.user_id)
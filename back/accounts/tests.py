@@ -1,3 +1,38 @@
-from django.test import TestCase
+from webify.testing import QueryBudgetTestCase
 
-# Create your tests here.
+
+class AccountEndpointBudgetTests(QueryBudgetTestCase):
+
+    def test_favorites(self):
+        response = self.assertBudget('/api/auth/favorites/', queries=2, ms=200, user=self.data.buyer)
+        self.assertEqual(len(response.data), 25)
+
+    def test_favorite_ids(self):
+        response = self.assertBudget('/api/auth/favorites/?ids_only=1', queries=1, ms=100, user=self.data.buyer)
+        self.assertEqual(len(response.data), 25)
+
+    def test_duplicate_favorite_is_rejected(self):
+        buyer = self.data.buyer
+        product_id = buyer.favorites.values_list('product_id', flat=True).first()
+        response = self.assertBudget('/api/auth/favorites/', queries=2, ms=100, user=buyer, method='post',
+                                     data={'product_id': product_id}, status=400)
+        self.assertIn('product_id', response.data)
+        self.assertEqual(buyer.favorites.filter(product_id=product_id).count(), 1)
+
+    def test_current_user(self):
+        self.assertBudget('/api/auth/users/me/', queries=0, ms=100, user=self.data.buyer)
+
+    def test_profile(self):
+        response = self.assertBudget('/api/auth/users/me/profile/', queries=1, ms=100, user=self.data.buyer)
+        self.assertEqual(response.data['order_count'], 10)
+        self.assertIsNotNone(response.data['last_order'])
+
+    def test_profile_orders(self):
+        response = self.assertBudget('/api/auth/users/me/orders/?page_size=5', queries=3, ms=200, user=self.data.buyer)
+        self.assertBudget(response.data['next'], queries=3, ms=200, user=self.data.buyer)
+
+    def test_customer_list(self):
+        self.assertBudget('/api/auth/customers/', queries=1, ms=300, user=self.data.admin)
+
+    def test_customer_detail(self):
+        self.assertBudget(f'/api/auth/customers/{self.data.buyer.pk}/', queries=1, ms=100, user=self.data.admin)
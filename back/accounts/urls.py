@@ -8,6 +8,7 @@ router.register(r'favorites', FavoriteViewSet, basename='favorite')
 urlpatterns = [
     path('users/me/', UserDetailView.as_view(), name='user-detail'),
     path('users/me/profile/', UserProfileDetailView.as_view(), name='user-profile-detail'),
+    path('users/me/orders/', UserOrderListView.as_view(), name='user-order-list'),
     path('customers/', UserListView.as_view(), name='user-list'),
     path('customers/<int:pk>/', UsersDetailsView.as_view(), name='user-detail'),
     path('', include(router.urls)),
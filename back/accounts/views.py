@@ -1,9 +1,16 @@
 from rest_framework import generics, permissions, viewsets, status, filters
 from django.contrib.auth import get_user_model
 from rest_framework.response import Response
-from django.db.models import Q
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch, Q
+from rest_framework.exceptions import ValidationError
 from .serializers import UserSerializer, UserProfileSerializer, FavoriteSerializer
-from .models import Favorite, UserAccount
+from .models import Favorite, UserAccount, UserProfile
+from orders.filters import OrderFilter
+from orders.models import Order
+from orders.pagination import OrderCursorPagination
+from orders.serializers import OrderSerializer
+from products.models import Product
 
 User = get_user_model()
 
@@ -20,20 +27,46 @@ class UserProfileDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
-        return self.request.user.userprofile
+        return generics.get_object_or_404(UserProfile.objects.with_order_summary(), user=self.request.user)
 
     def perform_update(self, serializer):
         serializer.save(user=self.request.user)
     
+class UserOrderListView(generics.ListAPIView):
+    """The current user's orders, newest first, paged by cursor (``users/me/orders/``)."""
+    serializer_class = OrderSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = OrderCursorPagination
+    filterset_class = OrderFilter
+
+    def get_queryset(self):
+        return Order.objects.filter(user=self.request.user).select_related('user').prefetch_related('items__product')
+
+
 class FavoriteViewSet(viewsets.ModelViewSet):
     serializer_class = FavoriteSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Favorite.objects.filter(user=self.request.user)
+        return Favorite.objects.filter(user=self.request.user).order_by('-created_at').prefetch_related(
+            Prefetch('product', queryset=Product.objects.with_review_stats().select_related('category'))
+        )
+
+    def list(self, request, *args, **kwargs):
+        # ?ids_only=1: just the favorited product IDs, for heart-icon state.
+        if request.query_params.get('ids_only', '').lower() in ('1', 'true', 'yes'):
+            return Response(list(
+                Favorite.objects.filter(user=request.user).values_list('product_id', flat=True)
+            ))
+        return super().list(request, *args, **kwargs)
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        try:
+            with transaction.atomic():
+                serializer.save(user=self.request.user)
+        except IntegrityError:
+            # A concurrent request added the same favorite after validation ran.
+            raise ValidationError({'product_id': ["This product is already in your favorites."]})
 
 class UserListView(generics.ListAPIView):
     serializer_class = UserSerializer
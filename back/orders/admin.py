@@ -5,5 +5,7 @@ admin.site.register(Cart)
 admin.site.register(CartItem)
 admin.site.register(Order)
 admin.site.register(OrderItem)
+admin.site.register(SellerDailySales)
+admin.site.register(SellerDailyOrders)
 admin.site.register(SubscriptionPlan)
 admin.site.register(Subscription)
@@ -0,0 +1,63 @@
+"""
+Cached item count and subtotal for the header cart badge.
+
+The badge is fetched on every page load, so ``get_summary()`` answers from the cache:
+the user's cart ID and the cart's summary live under separate keys, and a hit costs no
+queries. Summaries are keyed by cart ID so ``CartItem`` signals can drop them without
+looking up the owner; the bulk upsert path, which skips signals, calls ``invalidate``
+itself. A product price change drops the summary of every cart holding the product.
+"""
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import Cart, CartItem, line_total
+
+
+SUMMARY_TTL = 60 * 60
+SUMMARY_KEY = 'cart:summary:{}'
+CART_ID_KEY = 'cart:id:{}'
+NO_CART = 0
+
+EMPTY_SUMMARY = {'item_count': 0, 'subtotal': Decimal('0.00')}
+
+
+def load_summary(cart_id):
+    totals = CartItem.objects.filter(cart_id=cart_id).aggregate(item_count=Count('id'), subtotal=line_total())
+    return {'item_count': totals['item_count'], 'subtotal': totals['subtotal'] or Decimal('0.00')}
+
+
+def get_cart_id(user):
+    cart_id = cache.get(CART_ID_KEY.format(user.pk))
+    if cart_id is None:
+        cart_id = Cart.objects.filter(user=user).values_list('pk', flat=True).first() or NO_CART
+        cache.set(CART_ID_KEY.format(user.pk), cart_id, None)
+    return cart_id
+
+
+def get_summary(user):
+    """``{'item_count', 'subtotal'}`` for ``user``'s cart."""
+    cart_id = get_cart_id(user)
+    if cart_id == NO_CART:
+        return dict(EMPTY_SUMMARY)
+    summary = cache.get(SUMMARY_KEY.format(cart_id))
+    if summary is None:
+        summary = load_summary(cart_id)
+        cache.set(SUMMARY_KEY.format(cart_id), summary, SUMMARY_TTL)
+    return summary
+
+
+def invalidate(cart_id):
+    cache.delete(SUMMARY_KEY.format(cart_id))
+
+
+def invalidate_product(product_id):
+    """Drop the summaries of the carts holding ``product_id``."""
+    cart_ids = CartItem.objects.filter(product_id=product_id).values_list('cart_id', flat=True)
+    cache.delete_many([SUMMARY_KEY.format(cart_id) for cart_id in cart_ids])
+
+
+def forget_cart(user_id):
+    """Drop the cached cart ID after a cart is created or deleted."""
+    cache.delete(CART_ID_KEY.format(user_id))
@@ -0,0 +1,57 @@
+"""
+Per-user index of purchased product IDs, kept in the cache.
+
+Download and access checks ask ``user_owns()`` instead of joining OrderItem to Order on
+every request; catalog pages can use ``owned_ids()`` to mark owned products in bulk.
+"""
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Order, OrderItem
+
+
+ENTITLEMENT_TTL = 60 * 60 * 24
+ENTITLEMENT_KEY = 'entitlements:{}'
+
+
+def load_owned_ids(user_id):
+    return frozenset(
+        OrderItem.objects.filter(
+            order__user_id=user_id,
+            order__payment_status=Order.COMPLETE,
+            product__isnull=False,
+        ).values_list('product_id', flat=True)
+    )
+
+
+def refresh(user_id):
+    owned = load_owned_ids(user_id)
+    cache.set(ENTITLEMENT_KEY.format(user_id), owned, ENTITLEMENT_TTL)
+    return owned
+
+
+def invalidate(user_id):
+    """
+    Drop ``user_id``'s index once the current transaction commits; dropping it earlier
+    lets a concurrent ``owned_ids()`` re-cache the pre-commit set for the whole TTL.
+    """
+    transaction.on_commit(lambda: cache.delete(ENTITLEMENT_KEY.format(user_id)))
+
+
+def owned_ids(user):
+    """Set of product IDs ``user`` has completed orders for."""
+    if user is None or not user.is_authenticated:
+        return frozenset()
+    owned = cache.get(ENTITLEMENT_KEY.format(user.pk))
+    if owned is None:
+        owned = refresh(user.pk)
+    return owned
+
+
+def user_owns(user, product_id):
+    return product_id in owned_ids(user)
+
+
+def grant_order(order):
+    """Re-warm the buyer's index right after ``order`` flips to complete."""
+    return refresh(order.user_id)
@@ -0,0 +1,21 @@
+from django_filters import rest_framework as filters
+
+from .models import Order
+
+
+class OrderFilter(filters.FilterSet):
+    """``?status=P``, ``?created_after=``/``?created_before=`` (dates or datetimes)."""
+    status = filters.ChoiceFilter(field_name='payment_status', choices=Order.STATUS_CHOICES)
+    created_after = filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='gte')
+    created_before = filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='lt')
+
+    class Meta:
+        model = Order
+        fields = ['status', 'created_after', 'created_before']
+
+
+class AdminOrderFilter(OrderFilter):
+    """Adds ``?user=<id>`` for the all-orders admin listing."""
+
+    class Meta(OrderFilter.Meta):
+        fields = OrderFilter.Meta.fields + ['user']
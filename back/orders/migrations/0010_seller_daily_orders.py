@@ -0,0 +1,50 @@
+# Generated by Django 5.2.6 on 2026-10-17 22:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def backfill_daily_orders(apps, schema_editor):
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    SellerDailyOrders = apps.get_model('orders', 'SellerDailyOrders')
+    rows = (
+        OrderItem.objects.filter(order__payment_status='C', product__isnull=False)
+        .annotate(day=TruncDate('order__created_at'))
+        .values('product__seller', 'day')
+        .annotate(orders=Count('order', distinct=True))
+        .order_by()
+    )
+    SellerDailyOrders.objects.bulk_create(
+        [
+            SellerDailyOrders(seller_id=row['product__seller'], day=row['day'], completed_orders=row['orders'])
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0009_seller_daily_sales'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SellerDailyOrders',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('completed_orders', models.IntegerField(default=0)),
+                ('seller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_orders', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('seller', 'day'), name='seller_daily_orders_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_daily_orders, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-17 23:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0010_seller_daily_orders'),
+        ('products', '0010_product_favorite_count'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sellerdailysales',
+            name='product',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='daily_sales', to='products.product'),
+        ),
+    ]
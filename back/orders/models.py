@@ -1,4 +1,7 @@
+from decimal import Decimal
 from django.db import models
+from django.db.models import Count, DecimalField, Exists, F, OuterRef, Prefetch, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.conf import settings
 from django.utils import timezone
 from products.models import Product
@@ -6,13 +9,44 @@ from products.models import Product
 User = settings.AUTH_USER_MODEL
 
 
+def line_total(prefix=''):
+    """``quantity * product price`` for cart items, optionally through a relation ``prefix``."""
+    return Sum(
+        F(f'{prefix}quantity') * F(f'{prefix}product__price'),
+        output_field=DecimalField(max_digits=12, decimal_places=2),
+    )
+
+
+class CartQuerySet(models.QuerySet):
+    def with_totals(self):
+        """Annotate ``item_count`` and ``subtotal`` in the cart query itself."""
+        return self.annotate(
+            item_count=Count('items'),
+            subtotal=Coalesce(line_total('items__'), Decimal('0.00')),
+        )
+
+    def with_items(self):
+        """Prefetch items with their products so ``total_cost`` and serializers stay in memory."""
+        return self.prefetch_related(
+            models.Prefetch('items', queryset=CartItem.objects.select_related('product').order_by('added_at', 'id'))
+        )
+
+
 class Cart(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='cart')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = CartQuerySet.as_manager()
+
     def total_cost(self):
+        if hasattr(self, 'subtotal'):
+            return self.subtotal
         return sum(item.total_price() for item in self.items.all())
 
+    def total_items(self):
+        if hasattr(self, 'item_count'):
+            return self.item_count
+        return len(self.items.all())
 
     def __str__(self):
         return f"{self.user.name}'s cart"
@@ -39,6 +73,35 @@ class CartItem(models.Model):
 
 
 
+class OrderQuerySet(models.QuerySet):
+    def recalculate_totals(self):
+        """Store the sum of each order's captured item prices in ``total`` (one UPDATE)."""
+        items_total = OrderItem.objects.filter(order=OuterRef('pk')).order_by().values('order').annotate(
+            total=Sum(F('price') * F('quantity'), output_field=DecimalField(max_digits=12, decimal_places=2))
+        ).values('total')
+        return self.update(total=Coalesce(Subquery(items_total), Decimal('0.00')))
+
+    def sold_by(self, seller):
+        """
+        Orders containing at least one of ``seller``'s products, as a seller sees them.
+
+        Matching uses an ``EXISTS`` subquery, so no ``DISTINCT`` over the item join is
+        needed. Only the seller's own lines are prefetched (as ``seller_items``) and
+        ``seller_subtotal`` sums just those lines.
+        """
+        seller_lines = OrderItem.objects.filter(order=OuterRef('pk'), product__seller=seller)
+        seller_subtotal = seller_lines.order_by().values('order').annotate(
+            subtotal=Sum(F('price') * F('quantity'), output_field=DecimalField(max_digits=12, decimal_places=2))
+        ).values('subtotal')
+        return self.filter(Exists(seller_lines)).annotate(
+            seller_subtotal=Coalesce(Subquery(seller_subtotal), Decimal('0.00')),
+        ).select_related('user').prefetch_related(Prefetch(
+            'items',
+            queryset=OrderItem.objects.filter(product__seller=seller).select_related('product'),
+            to_attr='seller_items',
+        ))
+
+
 class Order(models.Model):
 
     PENDING = 'P'
@@ -54,6 +117,8 @@ class Order(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='orders')
     created_at = models.DateTimeField(auto_now_add=True)
     payment_status = models.CharField(max_length=1, choices=STATUS_CHOICES, default=COMPLETE)
+    # Sum of the items' captured prices, written at checkout and whenever items change.
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
 
     # Add these fields
     shipping_address = models.TextField(blank=True, null=True)
@@ -63,9 +128,29 @@ class Order(models.Model):
     postal_code = models.CharField(max_length=20, blank=True, null=True)
     country = models.CharField(max_length=100, blank=True, null=True)
 
+    objects = OrderQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # A user's orders by status (entitlements, order history).
+            models.Index(fields=['user', 'payment_status'], name='order_user_status_idx'),
+            models.Index(fields=['-created_at'], name='order_created_idx'),
+        ]
+
     def __str__(self):
         return f"Order #{self.id} by {self.user.name}"
 
+    def recalculate_total(self):
+        Order.objects.filter(pk=self.pk).recalculate_totals()
+        self.refresh_from_db(fields=['total'])
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Remember the stored status so signals can tell when an order becomes complete.
+        instance = super().from_db(db, field_names, values)
+        instance._stored_payment_status = instance.__dict__.get('payment_status')
+        return instance
+
 
 
 class OrderItem(models.Model):
@@ -77,6 +162,62 @@ class OrderItem(models.Model):
     def total_price(self):
         return self.price * self.quantity
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Remember the stored product so signals can refresh its rollups after a change.
+        instance = super().from_db(db, field_names, values)
+        instance._stored_product_id = instance.__dict__.get('product_id')
+        return instance
+
+
+class SellerDailySales(models.Model):
+    """
+    Completed sales of one seller's product on one day (the order's creation date).
+
+    Maintained incrementally as orders enter or leave the complete status and as the
+    lines of complete orders change, so seller dashboards read one row per product per
+    day instead of scanning order items. Deleting a product keeps its rows, with
+    ``product`` cleared, so the seller's revenue history stays whole.
+    """
+    seller = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_sales')
+    product = models.ForeignKey(Product, on_delete=models.SET_NULL, null=True, related_name='daily_sales')
+    day = models.DateField()
+    units = models.IntegerField(default=0)
+    gross_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    completed_orders = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['seller', 'product', 'day'], name='seller_daily_sales_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['seller', 'day'], name='seller_daily_sales_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} on {self.day}: {self.units} units"
+
+
+class SellerDailyOrders(models.Model):
+    """
+    Number of distinct completed orders with at least one of the seller's products, per day.
+
+    Kept beside ``SellerDailySales`` because an order with several of the seller's
+    products appears in several product rows there; summing those would count it more
+    than once.
+    """
+    seller = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_orders')
+    day = models.DateField()
+    completed_orders = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['seller', 'day'], name='seller_daily_orders_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.seller_id} on {self.day}: {self.completed_orders} orders"
+
 
 class SubscriptionPlan(models.Model):
     name = models.CharField(max_length=100)
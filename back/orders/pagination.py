@@ -0,0 +1,6 @@
+from products.pagination import KeysetPagination
+
+
+class OrderCursorPagination(KeysetPagination):
+    """Newest-first keyset pages over ``(created_at, id)``, backed by ``order_created_idx``."""
+    page_size = 20
@@ -0,0 +1,120 @@
+"""
+Incremental per-seller, per-product daily sales rollups.
+
+``apply_order`` folds one order's lines into ``SellerDailySales`` (and the order itself
+into ``SellerDailyOrders``) with ``F()`` increments when the order becomes complete,
+and takes them back out with ``sign=-1`` when it stops being complete. When a line of
+an already complete order is added, edited or deleted, ``refresh_product_day``
+recomputes the rows that line counts towards. ``rebuild`` recomputes every row from
+scratch with two grouped queries and is what the ``rebuild_sales_rollups`` command
+runs; rows of deleted products have nothing left to recompute them from and are kept.
+"""
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DecimalField, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from products.models import Product
+
+from .models import Order, OrderItem, SellerDailyOrders, SellerDailySales
+
+
+def line_totals(items, *group_by):
+    """Units and revenue of ``items`` per seller and product (and any extra ``group_by``)."""
+    return items.values('product__seller', 'product', *group_by).annotate(
+        line_units=Sum('quantity'),
+        line_revenue=Sum(F('price') * F('quantity'), output_field=DecimalField(max_digits=12, decimal_places=2)),
+    ).order_by()
+
+
+def increment(model, key, **deltas):
+    """Add ``deltas`` to the ``model`` row at ``key``, creating it if it is missing."""
+    changes = {field: F(field) + delta for field, delta in deltas.items()}
+    if model.objects.filter(**key).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**deltas, **key)
+    except IntegrityError:
+        # Another transaction created the row first; add to it instead.
+        model.objects.filter(**key).update(**changes)
+
+
+def apply_order(order, sign=1):
+    """Add (``sign=1``) or remove (``sign=-1``) ``order``'s lines from the rollups."""
+    day = timezone.localdate(order.created_at)
+    rows = line_totals(OrderItem.objects.filter(order=order, product__isnull=False))
+    sellers = set()
+    for row in rows:
+        sellers.add(row['product__seller'])
+        increment(
+            SellerDailySales,
+            {'seller_id': row['product__seller'], 'product_id': row['product'], 'day': day},
+            units=sign * row['line_units'],
+            gross_revenue=sign * row['line_revenue'],
+            completed_orders=sign,
+        )
+    # Once per seller, however many of their products the order holds.
+    for seller_id in sellers:
+        increment(SellerDailyOrders, {'seller_id': seller_id, 'day': day}, completed_orders=sign)
+
+
+def refresh_product_day(product_id, day):
+    """Recompute ``product_id``'s row for ``day``, and its seller's order count, from the order lines."""
+    seller_id = Product.objects.filter(pk=product_id).values_list('seller_id', flat=True).first()
+    if seller_id is None:
+        return
+    items = OrderItem.objects.filter(order__payment_status=Order.COMPLETE, order__created_at__date=day)
+    totals = line_totals(items.filter(product_id=product_id)).annotate(line_orders=Count('order', distinct=True))
+    row = next(iter(totals), None) or {'line_units': 0, 'line_revenue': None, 'line_orders': 0}
+    SellerDailySales.objects.update_or_create(
+        seller_id=seller_id, product_id=product_id, day=day,
+        defaults={
+            'units': row['line_units'],
+            'gross_revenue': row['line_revenue'] or Decimal('0.00'),
+            'completed_orders': row['line_orders'],
+        },
+    )
+    orders = items.filter(product__seller=seller_id).values('order').distinct().count()
+    SellerDailyOrders.objects.update_or_create(seller_id=seller_id, day=day, defaults={'completed_orders': orders})
+
+
+def rebuild():
+    """Recompute every rollup row from completed orders. Returns the number of rows."""
+    items = OrderItem.objects.filter(order__payment_status=Order.COMPLETE, product__isnull=False)
+    rows = list(line_totals(items.annotate(day=TruncDate('order__created_at')), 'day').annotate(
+        line_orders=Count('order', distinct=True),
+    ))
+    orders = list(
+        items.annotate(day=TruncDate('order__created_at'))
+        .values('product__seller', 'day')
+        .annotate(orders=Count('order', distinct=True))
+        .order_by()
+    )
+    with transaction.atomic():
+        SellerDailyOrders.objects.all().delete()
+        SellerDailyOrders.objects.bulk_create(
+            [
+                SellerDailyOrders(seller_id=row['product__seller'], day=row['day'], completed_orders=row['orders'])
+                for row in orders
+            ],
+            batch_size=1000,
+        )
+        SellerDailySales.objects.filter(product__isnull=False).delete()
+        created = SellerDailySales.objects.bulk_create(
+            [
+                SellerDailySales(
+                    seller_id=row['product__seller'],
+                    product_id=row['product'],
+                    day=row['day'],
+                    units=row['line_units'],
+                    gross_revenue=row['line_revenue'] or Decimal('0.00'),
+                    completed_orders=row['line_orders'],
+                )
+                for row in rows
+            ],
+            batch_size=1000,
+        )
+    return len(created)
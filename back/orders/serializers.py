@@ -2,6 +2,7 @@ from rest_framework import serializers
 from .models import *
 from products.models import Product
 from accounts.models import UserAccount
+from . import services
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -31,10 +32,12 @@ class CartItemSerializer(serializers.ModelSerializer):
 
 class CartSerializer(serializers.ModelSerializer):
     items = CartItemSerializer(many=True, read_only=True)
+    item_count = serializers.IntegerField(source='total_items', read_only=True)
+    total = serializers.DecimalField(max_digits=12, decimal_places=2, source='total_cost', read_only=True)
 
     class Meta:
         model = Cart
-        fields = ['id', 'user', 'created_at', 'items']
+        fields = ['id', 'user', 'created_at', 'items', 'item_count', 'total']
         read_only_fields = ['user']
 
 
@@ -61,9 +64,8 @@ class OrderItemSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 class OrderSerializer(serializers.ModelSerializer):
-    items = OrderItemSerializer(many=True)
+    items = OrderItemSerializer(many=True, read_only=True)
     user = UserSerializer(read_only=True)
-    total = serializers.SerializerMethodField()
 
     class Meta:
         model = Order
@@ -71,39 +73,96 @@ class OrderSerializer(serializers.ModelSerializer):
                  'shipping_address', 'phone', 'city', 'state', 'postal_code', 'country']
         read_only_fields = ['id', 'user', 'created_at', 'total']
 
-    def get_total(self, obj):
-        """Calculate the total cost of the order"""
-        # Use product price instead of order item price
-        # Each product can only be purchased once, so quantity is always 1
-        total = sum(item.product.price for item in obj.items.all())
-        return total
 
-    def create(self, validated_data):
-        items_data = validated_data.pop('items', [])
+class CartSummarySerializer(serializers.Serializer):
+    item_count = serializers.IntegerField()
+    subtotal = serializers.DecimalField(max_digits=12, decimal_places=2)
 
-        # Include all shipping and billing fields
-        order = Order.objects.create(**validated_data)
 
-        # Process each item, ensuring each product is only added once
-        processed_products = set()
-        for item_data in items_data:
-            product = item_data['product']
+class OrderSummarySerializer(serializers.ModelSerializer):
+    """List row for the admin order table; the detail endpoint has the items."""
+    user = UserSerializer(read_only=True)
+    item_count = serializers.IntegerField(read_only=True)
 
-            # Skip if we've already processed this product
-            if product.id in processed_products:
-                continue
+    class Meta:
+        model = Order
+        fields = ['id', 'user', 'created_at', 'payment_status', 'total', 'item_count']
+        read_only_fields = fields
+
+
+class SellerOrderSerializer(serializers.ModelSerializer):
+    """An order as one seller sees it: their own lines and what those lines earned."""
+    user = UserSerializer(read_only=True)
+    items = OrderItemSerializer(many=True, read_only=True, source='seller_items')
+    seller_subtotal = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
 
-            processed_products.add(product.id)
+    class Meta:
+        model = Order
+        fields = ['id', 'user', 'created_at', 'payment_status', 'items', 'seller_subtotal']
+        read_only_fields = fields
+
+
+class SellerDailySalesSerializer(serializers.ModelSerializer):
+    product = ProductLiteSerializer(read_only=True, allow_null=True)
+
+    class Meta:
+        model = SellerDailySales
+        fields = ['day', 'product', 'units', 'gross_revenue', 'completed_orders']
 
-            # Always set quantity to 1
-            OrderItem.objects.create(
-                order=order,
-                product=product,
-                quantity=1,
-                price=product.price
-            )
 
-        return order
+class SellerSalesDaySerializer(serializers.Serializer):
+    day = serializers.DateField()
+    units = serializers.IntegerField()
+    gross_revenue = serializers.DecimalField(max_digits=12, decimal_places=2)
+    completed_orders = serializers.IntegerField()
+
+
+class SellerSalesTotalsSerializer(serializers.Serializer):
+    units = serializers.IntegerField()
+    gross_revenue = serializers.DecimalField(max_digits=12, decimal_places=2)
+    completed_orders = serializers.IntegerField()
+    pending_orders = serializers.IntegerField()
+
+
+class LineItemSerializer(serializers.Serializer):
+    product_id = serializers.IntegerField(min_value=1)
+    quantity = serializers.IntegerField(min_value=1, default=1)
+
+
+class CartBulkSerializer(serializers.Serializer):
+    items = LineItemSerializer(many=True, allow_empty=False)
+
+
+class CheckoutSerializer(OrderSerializer):
+    """
+    Write side of ``OrderSerializer``: places the order through ``services.place_order``.
+
+    ``items`` are validated against a single ``in_bulk`` query instead of one lookup
+    per line; leaving them out orders whatever is in the buyer's cart.
+    """
+    items = LineItemSerializer(many=True, required=False)
+
+    def validate_items(self, items):
+        # Only a missing ``items`` means "the whole cart"; an empty selection is an error.
+        if not items:
+            raise serializers.ValidationError("Select at least one product, or leave out items to order your cart.")
+        product_ids = [item['product_id'] for item in items]
+        products = services.snapshot_prices(product_ids)
+        missing = sorted(set(product_ids) - set(products))
+        if missing:
+            raise serializers.ValidationError(f"Invalid product ids: {missing}")
+        return [products[product_id] for product_id in product_ids]
+
+    def create(self, validated_data):
+        products = validated_data.pop('items', None)
+        try:
+            return services.place_order(validated_data.pop('user'), products, **validated_data)
+        except services.EmptyCheckout as e:
+            raise serializers.ValidationError({'items': [str(e)]})
+
+    def to_representation(self, instance):
+        order = Order.objects.select_related('user').prefetch_related('items__product').get(pk=instance.pk)
+        return OrderSerializer(order, context=self.context).data
 
 
 # -------------------
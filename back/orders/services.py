@@ -0,0 +1,93 @@
+"""
+Cart and checkout pipelines.
+
+``add_to_cart`` upserts any number of cart lines with one validation query and one
+``INSERT ... ON CONFLICT`` on the ``(cart, product)`` unique constraint.
+
+``place_order`` turns a list of products (or the buyer's cart) into an order with a
+fixed number of round trips: one price snapshot query, one INSERT for the order, one
+bulk INSERT for its items and one DELETE for the cart, all in a single transaction so
+a failure part-way through never leaves a partial order or a half-cleared cart.
+"""
+from django.db import transaction
+
+from products.models import Product
+
+from . import cart_summary
+from .models import Cart, CartItem, Order, OrderItem
+
+
+class EmptyCheckout(Exception):
+    """Raised when there is nothing to order."""
+
+
+class UnknownProducts(Exception):
+    """Raised with the sorted list of product IDs that do not exist."""
+
+
+def snapshot_prices(product_ids):
+    """``{id: product}`` for ``product_ids`` in one query, carrying only what an order line needs."""
+    return Product.objects.only('id', 'title', 'price').in_bulk(product_ids)
+
+
+def cart_products(user):
+    return list(
+        Product.objects.filter(cartitem__cart__user=user).only('id', 'title', 'price').order_by('cartitem__added_at')
+    )
+
+
+def place_order(user, products=None, **order_fields):
+    """
+    Create an order for ``user`` and clear their cart.
+
+    ``products`` are already-loaded Product rows, duplicates ignored; when omitted the
+    order is built from the cart. Every product is a single-licence line, so quantity
+    is always 1 and the captured price is the product's price at checkout.
+    """
+    with transaction.atomic():
+        if products is None:
+            products = cart_products(user)
+
+        lines = list({product.pk: product for product in products}.values())
+        if not lines:
+            raise EmptyCheckout('Your cart is empty.')
+
+        order = Order.objects.create(
+            user=user,
+            total=sum(product.price for product in lines),
+            **order_fields
+        )
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=product, price=product.price, quantity=1)
+            for product in lines
+        ])
+        CartItem.objects.filter(cart__user=user).delete()
+    return order
+
+
+def add_to_cart(user, lines):
+    """
+    Set the quantity of every ``(product_id, quantity)`` in ``lines`` in ``user``'s cart.
+
+    Products already in the cart get the new quantity; repeated IDs keep the last one.
+    Returns the cart.
+    """
+    quantities = dict(lines)
+    known = set(Product.objects.filter(pk__in=quantities).values_list('pk', flat=True))
+    missing = sorted(set(quantities) - known)
+    if missing:
+        raise UnknownProducts(missing)
+
+    cart, _ = Cart.objects.get_or_create(user=user)
+    CartItem.objects.bulk_create(
+        [
+            CartItem(cart=cart, product_id=product_id, quantity=quantity)
+            for product_id, quantity in quantities.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['cart', 'product'],
+        update_fields=['quantity'],
+    )
+    # bulk_create sends no post_save, so the badge summary is dropped here.
+    cart_summary.invalidate(cart.pk)
+    return cart
@@ -0,0 +1,78 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from products.models import Product
+from .models import Cart, CartItem, Order, OrderItem
+from . import cart_summary, entitlements, rollups
+
+
+@receiver([post_save, post_delete], sender=Order)
+def invalidate_entitlements_for_order(sender, instance, **kwargs):
+    entitlements.invalidate(instance.user_id)
+
+
+@receiver(post_save, sender=Order)
+def update_sales_rollups(sender, instance, created, **kwargs):
+    was_complete = not created and getattr(instance, '_stored_payment_status', None) == Order.COMPLETE
+    is_complete = instance.payment_status == Order.COMPLETE
+    instance._stored_payment_status = instance.payment_status
+    if was_complete == is_complete:
+        return
+    # Deferred to commit so an order created complete at checkout is counted with its items.
+    transaction.on_commit(lambda: rollups.apply_order(instance, sign=1 if is_complete else -1))
+
+
+@receiver(pre_delete, sender=Order)
+def remove_deleted_order_from_rollups(sender, instance, **kwargs):
+    # Before the cascade removes the items the rollup rows were built from.
+    if getattr(instance, '_stored_payment_status', None) == Order.COMPLETE:
+        rollups.apply_order(instance, sign=-1)
+
+
+@receiver([post_save, post_delete], sender=OrderItem)
+def invalidate_entitlements_for_item(sender, instance, **kwargs):
+    entitlements.invalidate(instance.order.user_id)
+
+
+@receiver([post_save, post_delete], sender=OrderItem)
+def update_sales_rollups_for_item(sender, instance, **kwargs):
+    # Lines of orders that are not complete are picked up when the order completes.
+    order = instance.order
+    product_ids = {instance.product_id, getattr(instance, '_stored_product_id', None)} - {None}
+    instance._stored_product_id = instance.product_id
+    if order.payment_status != Order.COMPLETE:
+        return
+    day = timezone.localdate(order.created_at)
+    # Recomputed rather than incremented, so it stays right when it runs after the
+    # apply_order of an order completed in the same transaction.
+    for product_id in product_ids:
+        transaction.on_commit(lambda product_id=product_id: rollups.refresh_product_day(product_id, day))
+
+
+@receiver([post_save, post_delete], sender=CartItem)
+def invalidate_cart_summary(sender, instance, **kwargs):
+    cart_summary.invalidate(instance.cart_id)
+
+
+@receiver(post_save, sender=Product)
+def invalidate_cart_summaries_for_price(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and 'price' not in update_fields:
+        return
+    stored_price = getattr(instance, '_stored_price', None)
+    instance._stored_price = instance.price
+    if created or (stored_price is not None and stored_price == instance.price):
+        return
+    cart_summary.invalidate_product(instance.pk)
+
+
+@receiver(post_save, sender=Cart)
+def remember_new_cart(sender, instance, created, **kwargs):
+    if created:
+        cart_summary.forget_cart(instance.user_id)
+
+
+@receiver(post_delete, sender=Cart)
+def forget_deleted_cart(sender, instance, **kwargs):
+    cart_summary.forget_cart(instance.user_id)
+    cart_summary.invalidate(instance.pk)
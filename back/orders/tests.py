@@ -1,3 +1,212 @@
-from django.test import TestCase
+from decimal import Decimal
 
-# Create your tests here.
+from django.db.models import Sum
+from django.utils import timezone
+
+from webify.testing import QueryBudgetTestCase
+
+from . import entitlements, rollups
+from products.models import Product
+
+from .models import CartItem, Order, OrderItem, SellerDailySales
+
+
+class OrderEndpointBudgetTests(QueryBudgetTestCase):
+
+    def test_cart(self):
+        self.assertBudget('/api/cart/', queries=3, ms=200, user=self.data.buyer)
+
+    def test_cart_summary(self):
+        response = self.assertBudget('/api/cart/summary/', queries=2, ms=100, user=self.data.buyer)
+        self.assertEqual(response.data['item_count'], CartItem.objects.filter(cart__user=self.data.buyer).count())
+        self.assertBudget('/api/cart/summary/', queries=0, ms=50, user=self.data.buyer)
+
+    def test_cart_summary_follows_price_changes(self):
+        item = CartItem.objects.filter(cart__user=self.data.buyer).select_related('product').first()
+        before = self.cart_subtotal()
+        product = Product.objects.get(pk=item.product_id)
+        product.price += 5
+        product.save()
+        self.assertEqual(self.cart_subtotal(), before + 5 * item.quantity)
+
+    def cart_subtotal(self):
+        self.client.force_authenticate(self.data.buyer)
+        return Decimal(self.client.get('/api/cart/summary/').data['subtotal'])
+
+    def test_cart_items(self):
+        self.assertBudget('/api/cart-items/', queries=2, ms=200, user=self.data.buyer)
+
+    def test_cart_bulk(self):
+        products = self.data.products[200:240]
+        response = self.assertBudget('/api/cart-items/bulk/', queries=5, ms=300, user=self.data.buyer, method='post', data={
+            'items': [{'product_id': product.pk, 'quantity': 1} for product in products],
+        })
+        self.assertEqual(len(response.data['items']), CartItem.objects.filter(cart__user=self.data.buyer).count())
+        self.assertIn('total', response.data)
+
+    def test_order_list(self):
+        self.assertBudget('/api/orders/', queries=3, ms=300, user=self.data.buyer)
+
+    def test_order_detail(self):
+        self.assertBudget(f'/api/orders/{self.data.order.pk}/', queries=6, ms=200, user=self.data.buyer)
+
+    def test_checkout(self):
+        products = self.data.products[100:130]
+        response = self.assertBudget('/api/orders/', queries=10, ms=300, user=self.data.buyer, method='post', data={
+            'payment_status': 'P',
+            'items': [{'product_id': product.pk, 'quantity': 1} for product in products],
+            'shipping_address': '1 Test Street', 'city': 'Cairo', 'country': 'EG',
+        }, status=201)
+        self.assertEqual(len(response.data['items']), len(products))
+        self.assertEqual(Decimal(response.data['total']), sum(product.price for product in products))
+        self.assertFalse(CartItem.objects.filter(cart__user=self.data.buyer).exists())
+
+    def test_checkout_from_cart(self):
+        in_cart = CartItem.objects.filter(cart__user=self.data.buyer).count()
+        response = self.assertBudget('/api/orders/', queries=10, ms=300, user=self.data.buyer, method='post', data={
+            'payment_status': 'P', 'shipping_address': '1 Test Street',
+        }, status=201)
+        self.assertEqual(len(response.data['items']), in_cart)
+
+    def test_checkout_rejects_empty_selection(self):
+        in_cart = CartItem.objects.filter(cart__user=self.data.buyer).count()
+        orders = Order.objects.filter(user=self.data.buyer).count()
+        response = self.assertBudget('/api/orders/', queries=1, ms=200, user=self.data.buyer, method='post', data={
+            'payment_status': 'P', 'items': [], 'shipping_address': '1 Test Street',
+        }, status=400)
+        self.assertIn('items', response.data)
+        self.assertEqual(Order.objects.filter(user=self.data.buyer).count(), orders)
+        self.assertEqual(CartItem.objects.filter(cart__user=self.data.buyer).count(), in_cart)
+
+    def test_seller_orders(self):
+        response = self.assertBudget('/api/seller-orders/', queries=2, ms=200, user=self.data.seller)
+        seller_products = {product.pk for product in self.data.products if product.seller_id == self.data.seller.pk}
+        for order in response.data['results']:
+            self.assertTrue(order['items'])
+            self.assertTrue({item['product']['id'] for item in order['items']} <= seller_products)
+            self.assertEqual(
+                Decimal(order['seller_subtotal']),
+                sum(Decimal(item['product']['price']) for item in order['items']),
+            )
+        self.assertBudget(response.data['next'], queries=2, ms=200, user=self.data.seller)
+
+    def test_seller_sales(self):
+        self.assertBudget('/api/seller-sales/', queries=1, ms=200, user=self.data.seller)
+        self.assertBudget('/api/seller-sales/daily/?day__gte=2000-01-01', queries=2, ms=100, user=self.data.seller)
+
+    def test_seller_sales_totals(self):
+        seller = self.data.seller
+        response = self.assertBudget('/api/seller-sales/totals/', queries=3, ms=200, user=seller)
+        lines = OrderItem.objects.filter(order__payment_status=Order.COMPLETE, product__seller=seller)
+        self.assertEqual(Decimal(response.data['gross_revenue']), sum(line.price * line.quantity for line in lines))
+        self.assertEqual(response.data['completed_orders'], lines.values('order').distinct().count())
+        self.assertEqual(
+            response.data['pending_orders'],
+            Order.objects.filter(payment_status=Order.PENDING, items__product__seller=seller).distinct().count(),
+        )
+
+    def test_daily_sales_count_each_order_once(self):
+        seller = self.data.seller
+        products = [product for product in self.data.products if product.seller_id == seller.pk][:2]
+        order = Order.objects.create(user=self.data.buyer, payment_status=Order.PENDING)
+        for product in products:
+            order.items.create(product=product, price=product.price, quantity=1)
+
+        def orders_today(query=''):
+            response = self.assertBudget(f'/api/seller-sales/daily/?{query}', queries=2, ms=200, user=seller)
+            today = timezone.localdate(order.created_at).isoformat()
+            return next((row['completed_orders'] for row in response.data if row['day'] == today), 0)
+
+        before = orders_today()
+        product_before = orders_today(f'product={products[0].pk}')
+        with self.captureOnCommitCallbacks(execute=True):
+            order.payment_status = Order.COMPLETE
+            order.save(update_fields=['payment_status'])
+        self.assertEqual(orders_today(), before + 1)
+        self.assertEqual(orders_today(f'product={products[0].pk}'), product_before + 1)
+
+        rollups.rebuild()
+        self.assertEqual(orders_today(), before + 1)
+
+    def test_sales_rollup_follows_status(self):
+        order = Order.objects.filter(payment_status=Order.PENDING).first()
+        line = order.items.select_related('product').first()
+        sales = SellerDailySales.objects.filter(product=line.product, seller=line.product.seller_id)
+        before = sales.aggregate(units=Sum('units'))['units'] or 0
+
+        with self.captureOnCommitCallbacks(execute=True):
+            order.payment_status = Order.COMPLETE
+            order.save(update_fields=['payment_status'])
+        self.assertEqual(sales.aggregate(units=Sum('units'))['units'], before + line.quantity)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            order.payment_status = Order.CANCELED
+            order.save(update_fields=['payment_status'])
+        self.assertEqual(sales.aggregate(units=Sum('units'))['units'], before)
+
+    def test_entitlements_are_dropped_on_commit(self):
+        order = Order.objects.filter(payment_status=Order.PENDING).first()
+        product_id = order.items.values_list('product_id', flat=True).first()
+        owned = entitlements.owned_ids(order.user)
+        self.assertNotIn(product_id, owned)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            order.payment_status = Order.COMPLETE
+            order.save(update_fields=['payment_status'])
+            # Still the committed state's index until the transaction ends.
+            self.assertEqual(entitlements.owned_ids(order.user), owned)
+        self.assertIn(product_id, entitlements.owned_ids(order.user))
+
+    def test_sales_rollup_follows_lines_of_complete_orders(self):
+        order = Order.objects.filter(payment_status=Order.COMPLETE).first()
+        line = order.items.select_related('product').first()
+        sales = SellerDailySales.objects.filter(
+            product=line.product, day=timezone.localdate(order.created_at)
+        ).values_list('units', 'gross_revenue', 'completed_orders')
+        before = sales.get()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            line.quantity += 2
+            line.save()
+        self.assertEqual(sales.get(), (before[0] + 2, before[1] + 2 * line.price, before[2]))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            line.delete()
+        after_delete = sales.get()
+        self.assertEqual(after_delete[0], before[0] - line.quantity + 2)
+        rollups.rebuild()
+        self.assertEqual(sales.get(), after_delete)
+
+    def test_deleted_product_keeps_sales_history(self):
+        product = Product.objects.create(
+            seller=self.data.seller, title='Retired Template', slug='retired-template', description='Gone.',
+            file='products/files/test.zip', price=10,
+        )
+        row = SellerDailySales.objects.create(
+            seller=self.data.seller, product=product, day=timezone.localdate(), units=3, gross_revenue=30,
+        )
+        product.delete()
+        row.refresh_from_db()
+        self.assertEqual((row.product_id, row.units), (None, 3))
+
+    def test_admin_orders(self):
+        response = self.assertBudget('/api/admin/orders/', queries=1, ms=200, user=self.data.admin)
+        self.assertBudget(response.data['next'], queries=1, ms=200, user=self.data.admin)
+
+    def test_admin_orders_filtered(self):
+        buyer = self.data.buyers[3]
+        response = self.assertBudget(
+            f'/api/admin/orders/?status=P&user={buyer.pk}&created_after=2000-01-01', queries=2, ms=200, user=self.data.admin
+        )
+        self.assertEqual(
+            len(response.data['results']), Order.objects.filter(user=buyer, payment_status=Order.PENDING).count()
+        )
+
+    def test_order_items(self):
+        self.assertBudget('/api/order-items/', queries=1, ms=200, user=self.data.buyer)
+
+    def test_subscription_plans(self):
+        self.assertBudget('/api/subscription-plans/', queries=1, ms=100)
+
+    def test_subscriptions(self):
+        self.assertBudget('/api/subscriptions/', queries=2, ms=100, user=self.data.buyer)
@@ -5,7 +5,7 @@ from .views import (
     OrderViewSet, OrderItemViewSet,
     SubscriptionViewSet, SubscriptionPlanViewSet,
     AdminOrderViewSet,
-    SellerOrderViewSet
+    SellerOrderViewSet, SellerSalesViewSet
 )
 
 # Create a router and register our viewset with it.
@@ -14,6 +14,7 @@ router.register(r'cart', CartViewSet, basename='cart')
 router.register(r'cart-items', CartItemViewSet, basename='cart-item')
 router.register(r'orders', OrderViewSet, basename='order')
 router.register(r'seller-orders', SellerOrderViewSet, basename='seller-order')
+router.register(r'seller-sales', SellerSalesViewSet, basename='seller-sales')
 router.register(r'admin/orders', AdminOrderViewSet, basename='admin-order')
 router.register(r'order-items', OrderItemViewSet, basename='order-item')
 router.register(r'subscription-plans', SubscriptionPlanViewSet, basename='subscription-plan')
@@ -1,10 +1,17 @@
-from rest_framework.viewsets import ModelViewSet
-from rest_framework.permissions import IsAuthenticated, IsAdminUser
-from rest_framework import serializers
+from django.db.models import Count, Sum
+from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, SAFE_METHODS
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from .models import *
+from . import cart_summary, services
+from .filters import AdminOrderFilter, OrderFilter
+from .pagination import OrderCursorPagination
 from .serializers import (
-    CartSerializer, CartItemSerializer,
-    OrderSerializer, OrderItemSerializer,
+    CartSerializer, CartItemSerializer, CartBulkSerializer, CartSummarySerializer,
+    OrderSerializer, OrderItemSerializer, CheckoutSerializer, SellerOrderSerializer, OrderSummarySerializer,
+    SellerDailySalesSerializer, SellerSalesDaySerializer, SellerSalesTotalsSerializer,
     SubscriptionSerializer, SubscriptionPlanSerializer
 )
 
@@ -14,76 +21,85 @@ class CartViewSet(ModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Cart.objects.filter(user=self.request.user)
+        return Cart.objects.filter(user=self.request.user).with_totals().with_items()
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """Item count and subtotal for the header badge, served from the cache."""
+        return Response(CartSummarySerializer(cart_summary.get_summary(request.user)).data)
+
 
 class CartItemViewSet(ModelViewSet):
     serializer_class = CartItemSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return CartItem.objects.filter(cart__user=self.request.user)
+        return CartItem.objects.filter(cart__user=self.request.user).select_related('product')
 
     def perform_create(self, serializer):
         cart, _ = Cart.objects.get_or_create(user=self.request.user)
         serializer.save(cart=cart)
 
+    @action(detail=False, methods=['post'], serializer_class=CartBulkSerializer)
+    def bulk(self, request):
+        """Add or re-quantify many products at once and return the resulting cart."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        lines = [(item['product_id'], item['quantity']) for item in serializer.validated_data['items']]
+        try:
+            cart = services.add_to_cart(request.user, lines)
+        except services.UnknownProducts as e:
+            raise serializers.ValidationError({'items': [f"Invalid product ids: {e.args[0]}"]})
+        cart = Cart.objects.with_totals().with_items().get(pk=cart.pk)
+        return Response(CartSerializer(cart, context=self.get_serializer_context()).data, status=status.HTTP_200_OK)
+
 
 class OrderViewSet(ModelViewSet):
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = OrderCursorPagination
+    filterset_class = OrderFilter
 
     def get_queryset(self):
-        return Order.objects.filter(user=self.request.user).prefetch_related('items')
+        return Order.objects.filter(user=self.request.user).select_related('user').prefetch_related('items__product')
 
-    def perform_create(self, serializer):
-        # Log what data is coming in
-        print("\n---- ORDER CREATE DATA ----")
-        print(f"User: {self.request.user}")
-        print(f"Data received: {self.request.data}")
-
-        # Save with user association
-        order = serializer.save(user=self.request.user)
-
-        # Log what was actually saved
-        print(f"Order created: {order.id}")
-        print(f"Shipping address: {order.shipping_address}")
-        print(f"Phone: {order.phone}")
-        print(f"City: {order.city}")
-        print(f"State: {order.state}")
-        print(f"Postal Code: {order.postal_code}")
-        print(f"Country: {order.country}")
-
-        # Clear the user's cart *after* the order is successfully created.
-        try:
-            cart = Cart.objects.get(user=self.request.user)
-            # Optimization: Use clear() if available, otherwise delete() is fine.
-            # cart.items.clear() # Use this if you prefer, but delete() works.
-            cart.items.all().delete()
-        except Cart.DoesNotExist:
-            # Handle case where cart might not exist (though it should if items were added)
-            # Consider logging this occurrence for investigation.
-            print(f"Warning: Cart not found for user {self.request.user.id} after order creation.")
-            pass # Continue even if cart clearing fails
+    def get_serializer_class(self):
+        if self.action == 'create':
+            return CheckoutSerializer
+        return OrderSerializer
 
-        # No need to return the order explicitly here unless the view framework requires it
-        # The default ModelViewSet behavior handles the response generation.
+    def perform_create(self, serializer):
+        # Items, the price snapshot and clearing the cart all happen in one transaction.
+        serializer.save(user=self.request.user)
 
 
 class AdminOrderViewSet(ModelViewSet):
     """
     ViewSet for admin users to manage all orders in the system.
     Only users with admin privileges can access this endpoint.
+
+    The list is cursor-paginated summary rows (filter by status, date range and user);
+    the detail view returns the full order with its items.
     """
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated, IsAdminUser]
+    pagination_class = OrderCursorPagination
+    filterset_class = AdminOrderFilter
 
     def get_queryset(self):
         # Admins can see all orders
-        return Order.objects.all().prefetch_related('items', 'user')
+        queryset = Order.objects.all().select_related('user')
+        if self.action == 'list':
+            return queryset.annotate(item_count=Count('items'))
+        return queryset.prefetch_related('items__product')
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return OrderSummarySerializer
+        return OrderSerializer
 
 
 class OrderItemViewSet(ModelViewSet):
@@ -91,7 +107,7 @@ class OrderItemViewSet(ModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return OrderItem.objects.filter(order__user=self.request.user)
+        return OrderItem.objects.filter(order__user=self.request.user).select_related('product')
 
     def perform_create(self, serializer):
         # Ensure the order is set when creating an OrderItem
@@ -99,6 +115,16 @@ class OrderItemViewSet(ModelViewSet):
         if not order:
             raise serializers.ValidationError("No active order found for the user.")
         serializer.save(order=order)
+        order.recalculate_total()
+
+    def perform_update(self, serializer):
+        item = serializer.save()
+        item.order.recalculate_total()
+
+    def perform_destroy(self, instance):
+        order = instance.order
+        instance.delete()
+        order.recalculate_total()
 
 
 class SubscriptionPlanViewSet(ModelViewSet):
@@ -116,16 +142,70 @@ class SubscriptionViewSet(ModelViewSet):
 
 class SellerOrderViewSet(ModelViewSet):
     """
-    ViewSet for sellers to view orders containing their products.
+    Sales feed for sellers: orders containing their products, newest first.
+
+    Each order carries only the seller's own lines and their subtotal. Reads page by
+    cursor; writes still go through ``OrderSerializer``.
     """
-    serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = OrderCursorPagination
+    filterset_class = OrderFilter
+
+    def get_queryset(self):
+        return Order.objects.sold_by(self.request.user)
+
+    def get_serializer_class(self):
+        if self.request.method in SAFE_METHODS:
+            return SellerOrderSerializer
+        return OrderSerializer
+
+
+class SellerSalesViewSet(ReadOnlyModelViewSet):
+    """
+    The seller's daily sales rollups, one row per product per day, newest first.
+
+    Filter with ``?day__gte=`` / ``?day__lte=`` and ``?product=``; ``daily/`` sums the
+    same rows across products into one row per day, taking the order count from
+    ``SellerDailyOrders`` so an order is counted once. ``totals/`` is the dashboard
+    summary: lifetime sales from the same rollups plus the number of pending orders.
+    """
+    serializer_class = SellerDailySalesSerializer
+    permission_classes = [IsAuthenticated]
+    filterset_fields = {'day': ['gte', 'lte'], 'product': ['exact']}
+    index_scope = 'seller'
 
     def get_queryset(self):
-        user = self.request.user
-        if not user.is_authenticated:
-            return Order.objects.none() # Should not happen due to IsAuthenticated
-        # Filter orders that contain at least one product sold by the current user.
-        # .distinct() is important to avoid duplicate orders if an order has multiple items from the same seller.
-        # .prefetch_related() helps to optimize database queries.
-        return Order.objects.filter(items__product__seller=user).distinct().prefetch_related('items', 'items__product', 'user')
+        return SellerDailySales.objects.filter(seller=self.request.user).select_related('product').order_by('-day', 'product')
+
+    @action(detail=False, methods=['get'])
+    def daily(self, request):
+        sales = self.filter_queryset(self.get_queryset())
+        rows = list(sales.order_by('-day').values('day').annotate(
+            units=Sum('units'),
+            gross_revenue=Sum('gross_revenue'),
+            completed_orders=Sum('completed_orders'),
+        ))
+        # A product row counts each order once, but an order with several of the
+        # seller's products is in several rows, so across products use the per-day count.
+        if rows and 'product' not in request.query_params:
+            orders = dict(
+                SellerDailyOrders.objects.filter(seller=request.user, day__range=(rows[-1]['day'], rows[0]['day']))
+                .values_list('day', 'completed_orders')
+            )
+            for row in rows:
+                row['completed_orders'] = orders.get(row['day'], 0)
+        return Response(SellerSalesDaySerializer(rows, many=True).data)
+
+    @action(detail=False, methods=['get'])
+    def totals(self, request):
+        totals = SellerDailySales.objects.filter(seller=request.user).aggregate(
+            units=Sum('units'), gross_revenue=Sum('gross_revenue'),
+        )
+        completed = SellerDailyOrders.objects.filter(seller=request.user).aggregate(total=Sum('completed_orders'))
+        data = {
+            'units': totals['units'] or 0,
+            'gross_revenue': totals['gross_revenue'] or 0,
+            'completed_orders': completed['total'] or 0,
+            'pending_orders': Order.objects.filter(payment_status=Order.PENDING).sold_by(request.user).count(),
+        }
+        return Response(SellerSalesTotalsSerializer(data).data)
@@ -0,0 +1,115 @@
+"""
+Outbox for verified Paymob webhook deliveries.
+
+``enqueue`` is all the webhook does after the HMAC check: one ``INSERT`` that ignores
+a redelivery of a callback already received. Callbacks are keyed by transaction id and
+the outcome they report, since Paymob sends a pending callback and later the final
+one for the same transaction. ``drain`` is the worker side: it claims a
+batch of pending rows with ``SELECT ... FOR UPDATE SKIP LOCKED`` (so several workers
+can run side by side), applies ``process_payment_event`` to each inside its own
+savepoint and records when it was processed.
+"""
+import logging
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import log
+from .models import Payment, PaymentEvent
+
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_ATTEMPTS = 5
+
+
+def transaction_of(data):
+    """``(transaction id, Paymob order id)`` from a webhook payload."""
+    obj = data.get('obj') or {}
+    order = obj.get('order')
+    paymob_order_id = order.get('id') if isinstance(order, dict) else order
+    try:
+        paymob_order_id = int(paymob_order_id)
+    except (TypeError, ValueError):
+        paymob_order_id = None
+    transaction_id = obj.get('id')
+    return ('' if transaction_id in (None, '') else str(transaction_id)), paymob_order_id
+
+
+def outcome_of(data):
+    """The payment outcome a webhook payload reports: pending, paid or failed."""
+    obj = data.get('obj') or {}
+    if obj.get('pending'):
+        return Payment.PENDING
+    if obj.get('success') and not obj.get('error_occured'):
+        return Payment.PAID
+    return Payment.FAILED
+
+
+def enqueue(data):
+    """Store a verified delivery; a redelivery of a queued callback is a no-op."""
+    transaction_id, paymob_order_id = transaction_of(data)
+    if not transaction_id:
+        raise ValueError('Webhook payload has no transaction id')
+    PaymentEvent.objects.bulk_create(
+        [PaymentEvent(transaction_id=transaction_id, outcome=outcome_of(data),
+                      paymob_order_id=paymob_order_id, payload=data)],
+        ignore_conflicts=True,
+    )
+
+
+@dataclass
+class DrainStats:
+    processed: int = 0
+    failed: int = 0
+    latencies: list = field(default_factory=list)
+
+    @property
+    def max_latency(self):
+        return max(self.latencies, default=timedelta(0))
+
+    @property
+    def avg_latency(self):
+        if not self.latencies:
+            return timedelta(0)
+        return sum(self.latencies, timedelta(0)) / len(self.latencies)
+
+
+def drain(batch_size=DEFAULT_BATCH_SIZE, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Process one batch of pending events. Returns a ``DrainStats``."""
+    from .services import process_payment_event
+
+    stats = DrainStats()
+    with transaction.atomic():
+        batch = list(
+            PaymentEvent.objects.select_for_update(skip_locked=True)
+            .filter(status=PaymentEvent.PENDING)
+            .order_by('received_at', 'id')[:batch_size]
+        )
+        for event in batch:
+            try:
+                with transaction.atomic():
+                    event.result = process_payment_event(event.payload)
+            except Exception as e:
+                # The row is locked, so the in-memory count is current.
+                event.attempts += 1
+                event.last_error = str(e)
+                if event.attempts >= max_attempts:
+                    event.status = PaymentEvent.FAILED
+                event.save(update_fields=['attempts', 'last_error', 'status'])
+                log.event('event_failed', logging.WARNING, txn=event.transaction_id,
+                          attempts=event.attempts, gave_up=event.status == PaymentEvent.FAILED, error=str(e))
+                stats.failed += 1
+                continue
+            event.status = PaymentEvent.PROCESSED
+            event.processed_at = timezone.now()
+            event.attempts += 1
+            event.save(update_fields=['status', 'result', 'processed_at', 'attempts'])
+            stats.processed += 1
+            stats.latencies.append(event.processed_at - event.received_at)
+    if batch:
+        log.event('batch_drained', processed=stats.processed, failed=stats.failed,
+                  avg_latency_ms=round(stats.avg_latency.total_seconds() * 1000, 2),
+                  max_latency_ms=round(stats.max_latency.total_seconds() * 1000, 2))
+    return stats
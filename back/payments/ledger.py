@@ -0,0 +1,71 @@
+"""
+Payment state machine.
+
+Paymob redelivers webhooks and can deliver them out of order, and the buyer's browser
+reports outcomes through ``PaymentConfirmView`` as well, so the same outcome may
+arrive several times and a late failure may arrive after the success. ``transition``
+therefore moves a payment only along ``PAYMENT_TRANSITIONS``: ``paid`` is terminal and
+a failed payment can still be paid by a later attempt. Each move is a conditional
+``UPDATE ... WHERE status IN (...)`` on the payment and then on its order, so a replay
+writes nothing, and the completed-order side effects run only for the delivery that
+actually moved the order.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from orders import entitlements, rollups
+from orders.models import Order
+
+from .models import Payment
+
+
+# Outcome -> payment statuses it may replace.
+PAYMENT_TRANSITIONS = {
+    Payment.PAID: (Payment.PENDING, Payment.INITIATED, Payment.FAILED),
+    Payment.FAILED: (Payment.PENDING, Payment.INITIATED),
+}
+
+# Outcome -> (order status it sets, order statuses it may replace).
+ORDER_TRANSITIONS = {
+    Payment.PAID: (Order.COMPLETE, (Order.PENDING, Order.FAILED)),
+    Payment.FAILED: (Order.FAILED, (Order.PENDING,)),
+}
+
+
+def transition(payment, outcome, transaction_id=None):
+    """
+    Move ``payment`` (and its order) to ``outcome``, ``'paid'`` or ``'failed'``.
+
+    Returns False, having written nothing, when the payment is already past the point
+    where ``outcome`` applies.
+    """
+    changes = {'status': outcome, 'updated_at': timezone.now()}
+    if transaction_id:
+        changes['transaction_id'] = str(transaction_id)
+
+    with transaction.atomic():
+        moved = Payment.objects.filter(
+            pk=payment.pk, status__in=PAYMENT_TRANSITIONS[outcome]
+        ).update(**changes)
+        if not moved:
+            return False
+        for field, value in changes.items():
+            setattr(payment, field, value)
+
+        order_status, order_from = ORDER_TRANSITIONS[outcome]
+        order_moved = Order.objects.filter(
+            pk=payment.order_id, payment_status__in=order_from
+        ).update(payment_status=order_status)
+        if order_moved:
+            order_changed(payment.order_id)
+    return True
+
+
+def order_changed(order_id):
+    """The work ``Order``'s post_save handlers would do; ``update()`` skips them."""
+    order = Order.objects.only('id', 'user_id', 'created_at', 'payment_status').get(pk=order_id)
+    order._stored_payment_status = order.payment_status
+    entitlements.invalidate(order.user_id)
+    if order.payment_status == Order.COMPLETE:
+        transaction.on_commit(lambda: rollups.apply_order(order))
+        transaction.on_commit(lambda: entitlements.grant_order(order))
@@ -0,0 +1,128 @@
+"""
+Structured logging for the payment flow.
+
+``event()`` logs one line, ``payments.<name> key=value ...``, through the ``payments``
+logger, and passes the same fields as ``record.payment_fields`` for handlers that ship
+structured logs. It does nothing unless the level is enabled. Fields are redacted
+(``SENSITIVE_KEYS`` at any depth) and rendered only when a handler formats the record.
+Below WARNING, events are sampled at ``PAYMOB_LOG_SAMPLE_RATE``. Below ERROR, each
+event name is limited to ``PAYMOB_LOG_RATE_LIMIT`` lines per second, so a webhook retry
+storm cannot flood the logs. ``timed()`` adds an ``ms`` field with the duration of a
+step, and ``Stages`` collects several steps' durations for one event.
+"""
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+
+logger = logging.getLogger('payments')
+
+REDACTED = '***'
+SENSITIVE_KEYS = frozenset({
+    'hmac', 'signature', 'auth_token', 'api_key', 'token', 'payment_key',
+    'pan', 'source_data_pan', 'card_number', 'cvv', 'secret_key',
+})
+
+
+def redact(value):
+    """A copy of ``value`` with every ``SENSITIVE_KEYS`` entry masked."""
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if str(key).lower() in SENSITIVE_KEYS else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    return value
+
+
+class Fields:
+    """Renders ``key=value`` pairs only when the log record is formatted."""
+
+    def __init__(self, fields):
+        self.fields = fields
+
+    def __str__(self):
+        return ' '.join(
+            f'{key}={value if isinstance(value, (str, int, float)) else json.dumps(value, default=str)}'
+            for key, value in self.fields.items()
+        )
+
+
+class RateLimiter:
+    """Per-key token bucket allowing ``rate`` calls per second."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def allow(self, key):
+        now = time.monotonic()
+        with self.lock:
+            tokens, last = self.buckets.get(key, (self.rate, now))
+            tokens = min(self.rate, tokens + (now - last) * self.rate)
+            allowed = tokens >= 1
+            self.buckets[key] = (tokens - 1 if allowed else tokens, now)
+        return allowed
+
+
+_limiter = None
+
+
+def limiter():
+    global _limiter
+    if _limiter is None or _limiter.rate != settings.PAYMOB_LOG_RATE_LIMIT:
+        _limiter = RateLimiter(settings.PAYMOB_LOG_RATE_LIMIT)
+    return _limiter
+
+
+def event(name, level=logging.INFO, exc_info=False, **fields):
+    """Log ``name`` with ``fields``, subject to level, sampling and rate limits."""
+    if not logger.isEnabledFor(level):
+        return
+    if level < logging.WARNING and random.random() >= settings.PAYMOB_LOG_SAMPLE_RATE:
+        return
+    if level < logging.ERROR and not limiter().allow(name):
+        return
+    fields = redact(fields)
+    logger.log(
+        level, 'payments.%s %s', name, Fields(fields),
+        exc_info=exc_info, extra={'payment_event': name, 'payment_fields': fields},
+    )
+
+
+@contextmanager
+def timed(name, level=logging.INFO, **fields):
+    """
+    Log ``name`` with the step's duration in ``ms`` once the block finishes.
+
+    The block may add fields to the yielded dict. If the block raises, the event is
+    logged at ERROR with the exception and the exception propagates.
+    """
+    start = time.perf_counter()
+    try:
+        yield fields
+    except Exception as e:
+        fields['ms'] = round((time.perf_counter() - start) * 1000, 2)
+        event(name, logging.ERROR, exc_info=True, error=str(e), **fields)
+        raise
+    fields['ms'] = round((time.perf_counter() - start) * 1000, 2)
+    event(name, level, **fields)
+
+
+class Stages(dict):
+    """``with stages('name'):`` records the block's duration as ``name_ms``."""
+
+    @contextmanager
+    def __call__(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self[f'{name}_ms'] = round((time.perf_counter() - start) * 1000, 2)
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from payments import events
+
+
+class Command(BaseCommand):
+    help = "Apply queued Paymob webhook events in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=events.DEFAULT_BATCH_SIZE)
+        parser.add_argument('--max-attempts', type=int, default=events.DEFAULT_MAX_ATTEMPTS,
+                            help="Give up on an event after this many failed attempts.")
+        parser.add_argument('--sleep', type=float, default=1.0,
+                            help="Seconds to wait when the queue is empty.")
+        parser.add_argument('--once', action='store_true',
+                            help="Drain what is queued now and exit instead of polling.")
+
+    def handle(self, *args, **options):
+        while True:
+            stats = events.drain(options['batch_size'], options['max_attempts'])
+            if stats.processed or stats.failed:
+                self.stdout.write(
+                    f"Processed {stats.processed}, failed {stats.failed}; "
+                    f"latency avg {stats.avg_latency.total_seconds():.3f}s "
+                    f"max {stats.max_latency.total_seconds():.3f}s."
+                )
+            # A full batch means more may be waiting; only rest once the queue is empty.
+            if stats.processed + stats.failed >= options['batch_size']:
+                continue
+            if options['once']:
+                break
+            time.sleep(options['sleep'])
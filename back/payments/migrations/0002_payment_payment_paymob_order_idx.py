@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-17 22:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0007_order_order_user_status_idx_order_order_created_idx'),
+        ('payments', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['paymob_order_id'], name='payment_paymob_order_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-17 22:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0003_payment_event'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paymentevent',
+            name='result',
+            field=models.CharField(blank=True, choices=[('applied', 'Applied'), ('ignored', 'Ignored'), ('unmatched', 'Unmatched')], max_length=10),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.6 on 2026-10-17 23:40
+
+from django.db import migrations, models
+
+
+def backfill_outcome(apps, schema_editor):
+    PaymentEvent = apps.get_model('payments', 'PaymentEvent')
+    for event in PaymentEvent.objects.only('id', 'payload').iterator():
+        obj = event.payload.get('obj') or {}
+        if obj.get('pending'):
+            outcome = 'pending'
+        elif obj.get('success') and not obj.get('error_occured'):
+            outcome = 'paid'
+        else:
+            outcome = 'failed'
+        PaymentEvent.objects.filter(pk=event.pk).update(outcome=outcome)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0004_payment_event_result'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paymentevent',
+            name='outcome',
+            field=models.CharField(choices=[('pending', 'Pending'), ('paid', 'Paid'), ('failed', 'Failed')], default='failed', max_length=10),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_outcome, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='paymentevent',
+            name='transaction_id',
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AddConstraint(
+            model_name='paymentevent',
+            constraint=models.UniqueConstraint(fields=('transaction_id', 'outcome'), name='payment_event_unique'),
+        ),
+    ]
@@ -2,6 +2,10 @@ from django.db import models
 from orders.models import Order
 from django.conf import settings
 class Payment(models.Model):
+    PENDING = 'pending'
+    INITIATED = 'initiated'
+    PAID = 'paid'
+    FAILED = 'failed'
 
     order= models.OneToOneField(Order, on_delete=models.CASCADE, related_name='payment')
     user= models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL)
@@ -12,5 +16,76 @@ class Payment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Webhooks resolve the payment from Paymob's order id.
+            models.Index(fields=['paymob_order_id'], name='payment_paymob_order_idx'),
+        ]
+
+    def __str__(self):
+        return f"Payment {self.order.pk} ({self.status})"
+
+class PaymentEvent(models.Model):
+    """
+    Verified Paymob webhook delivery waiting for (or done with) processing.
+
+    The webhook only inserts a row and acknowledges; ``manage.py process_payment_events``
+    drains pending rows in batches. Rows are unique per ``(transaction_id, outcome)``,
+    so Paymob's retries of the same delivery collapse into one row while a later
+    callback that settles a pending transaction still gets its own.
+    """
+    PENDING = 'pending'
+    PROCESSED = 'processed'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (PROCESSED, 'Processed'),
+        (FAILED, 'Failed'),
+    ]
+
+    # What processing did to the payment (see ``payments.ledger``).
+    APPLIED = 'applied'
+    IGNORED = 'ignored'
+    UNMATCHED = 'unmatched'
+    RESULT_CHOICES = [
+        (APPLIED, 'Applied'),
+        (IGNORED, 'Ignored'),
+        (UNMATCHED, 'Unmatched'),
+    ]
+
+    # The state the callback reports for the transaction.
+    OUTCOME_CHOICES = [
+        (Payment.PENDING, 'Pending'),
+        (Payment.PAID, 'Paid'),
+        (Payment.FAILED, 'Failed'),
+    ]
+
+    transaction_id = models.CharField(max_length=100)
+    outcome = models.CharField(max_length=10, choices=OUTCOME_CHOICES)
+    paymob_order_id = models.BigIntegerField(null=True, blank=True)
+    payload = models.JSONField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    result = models.CharField(max_length=10, choices=RESULT_CHOICES, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['transaction_id', 'outcome'], name='payment_event_unique'),
+        ]
+        indexes = [
+            # The worker's queue scan: oldest pending first.
+            models.Index(fields=['status', 'received_at'], name='payment_event_queue_idx'),
+        ]
+
     def __str__(self):
-        return f"Payment {self.order.pk} ({self.status})"
\ No newline at end of file
+        return f"PaymentEvent {self.transaction_id} {self.outcome} ({self.status})"
+
+    @property
+    def latency(self):
+        """Time from receipt to processing, once processed."""
+        if self.processed_at is None:
+            return None
+        return self.processed_at - self.received_at
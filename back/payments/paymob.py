@@ -0,0 +1,132 @@
+"""
+HTTP client for the Paymob Accept API.
+
+One ``PaymobClient`` per process keeps a pooled keep-alive ``requests.Session``, so a
+checkout reuses warm TLS connections instead of opening three. Every call has a
+(connect, read) timeout and a bounded number of retries with exponential backoff.
+
+Order registration and payment-key calls are not idempotent, so they are only replayed
+when Paymob cannot have acted on them: failed connects, and 429/503 answers that carry
+``Retry-After``. Read timeouts and 502/504 (the request may have been processed behind
+the gateway) are never retried for them. The auth call only mints a token, so it also
+retries 429/502/503/504. The token is shared through the Django cache and reused until
+shortly before it expires; a 401 drops it and replays the call once with a fresh one.
+"""
+import threading
+import time
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+AUTH_PATH = '/api/auth/tokens'
+ORDER_PATH = '/api/ecommerce/orders'
+PAYMENT_KEY_PATH = '/api/acceptance/payment_keys'
+
+TOKEN_CACHE_KEY = 'paymob:auth-token'
+AUTH_RETRY_STATUSES = (429, 502, 503, 504)
+
+
+class PaymobRetry(Retry):
+    # Statuses replayed (for any call) only when the answer carries Retry-After.
+    RETRY_AFTER_STATUS_CODES = frozenset({429, 503})
+
+
+class PaymobClient:
+    def __init__(self, base_url=None, api_key=None, timeout=None, max_retries=None, token_ttl=None,
+                 backoff_factor=0.3, pool_size=10):
+        self.base_url = (base_url or settings.PAYMOB_BASE_URL).rstrip('/')
+        self.api_key = api_key if api_key is not None else settings.PAYMOB_API_KEY
+        self.timeout = timeout or settings.PAYMOB_TIMEOUT
+        self.token_ttl = token_ttl if token_ttl is not None else settings.PAYMOB_TOKEN_TTL
+        max_retries = settings.PAYMOB_MAX_RETRIES if max_retries is None else max_retries
+
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        retry = PaymobRetry(
+            total=max_retries,
+            connect=max_retries,
+            read=0,
+            status=max_retries,
+            status_forcelist=(),
+            allowed_methods=None,
+            backoff_factor=backoff_factor,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({'Content-Type': 'application/json'})
+        self._token_lock = threading.Lock()
+
+    def send(self, path, payload):
+        return self.session.post(self.base_url + path, json=payload, timeout=self.timeout)
+
+    def post(self, path, payload):
+        """POST a call that carries ``auth_token``, renewing the token once on a 401."""
+        response = self.send(path, payload)
+        if response.status_code == 401 and 'auth_token' in payload:
+            payload = {**payload, 'auth_token': self.auth_token(refresh=True)}
+            response = self.send(path, payload)
+        response.raise_for_status()
+        return response.json()
+
+    def fetch_token(self):
+        # Safe to repeat, so gateway errors are retried here as well.
+        for attempt in range(self.max_retries + 1):
+            response = self.send(AUTH_PATH, {'api_key': self.api_key})
+            if response.status_code not in AUTH_RETRY_STATUSES or attempt == self.max_retries:
+                break
+            time.sleep(self.backoff_factor * (2 ** attempt))
+        response.raise_for_status()
+        return response.json()['token']
+
+    def auth_token(self, refresh=False):
+        """A cached auth token, fetched from Paymob only when missing or ``refresh`` is set."""
+        token = None if refresh else cache.get(TOKEN_CACHE_KEY)
+        if token:
+            return token
+        # One fetch per process when many checkouts find the cache empty at once.
+        with self._token_lock:
+            token = None if refresh else cache.get(TOKEN_CACHE_KEY)
+            if not token:
+                token = self.fetch_token()
+                cache.set(TOKEN_CACHE_KEY, token, self.token_ttl)
+        return token
+
+    def register_order(self, payload):
+        return self.post(ORDER_PATH, payload)
+
+    def payment_key(self, payload):
+        return self.post(PAYMENT_KEY_PATH, payload)
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """The process-wide client, created on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = PaymobClient()
+    return _client
+
+
+def reset_client():
+    """Drop the process-wide client so the next call picks up changed settings."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
+from orders.models import Order
 from .models import Payment
 
 User = get_user_model()
@@ -29,15 +30,13 @@ class PaymentSerializer(serializers.ModelSerializer):
 
 
 class PaymentSessionSerializer(serializers.Serializer):
-    order_id     = serializers.IntegerField()
+    # Loads the order with its buyer for the billing data in the one validation query.
+    order_id     = serializers.PrimaryKeyRelatedField(
+        queryset=Order.objects.select_related('user'),
+        error_messages={'does_not_exist': "Order not found."},
+    )
     amount_cents = serializers.IntegerField(min_value=1)
 
-    def validate_order_id(self, value):
-        from orders.models import Order
-        if not Order.objects.filter(pk=value).exists():
-            raise serializers.ValidationError("Order not found.")
-        return value
-
 class PaymentConfirmSerializer(serializers.Serializer):
     payment_id    = serializers.IntegerField()
     transaction_id= serializers.CharField()
@@ -1,3 +1,371 @@
-from django.test import TestCase
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
 
-# Create your tests here.
+import requests
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from orders.models import Order
+
+from . import events, log, paymob, services
+from .models import Payment, PaymentEvent
+
+
+class StubPaymobHandler(BaseHTTPRequestHandler):
+    """
+    Answers the three Paymob endpoints. ``server.failures`` queues error answers per
+    path, each a status or a ``(status, headers)`` pair.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])) or b'{}')
+        self.server.calls.append((self.path, body, self.client_address[1]))
+        failures = self.server.failures.get(self.path)
+        if failures:
+            failure = failures.pop(0)
+            status, headers = failure if isinstance(failure, tuple) else (failure, {})
+            self.reply(status, {}, headers)
+        elif self.path == paymob.AUTH_PATH:
+            self.reply(201, {'token': f'token-{len(self.server.calls)}'})
+        elif self.path == paymob.ORDER_PATH:
+            self.reply(201, {'id': 4242})
+        elif self.path == paymob.PAYMENT_KEY_PATH:
+            self.reply(201, {'token': 'payment-key-0123456789abcdef'})
+        else:
+            self.reply(404, {})
+
+    def reply(self, status, payload, headers=None):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubPaymobMixin:
+    """Runs a ``StubPaymobHandler`` server for the test class."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubPaymobHandler)
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_port}'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.server.calls = []
+        self.server.failures = {}
+
+    def paths(self):
+        return [path for path, _, _ in self.server.calls]
+
+
+class PaymobClientTests(StubPaymobMixin, SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = paymob.PaymobClient(base_url=self.base_url, api_key='key', backoff_factor=0)
+        self.addCleanup(self.client.close)
+
+    def test_auth_token_is_cached(self):
+        first = self.client.auth_token()
+        self.assertEqual(self.client.auth_token(), first)
+        self.assertEqual(self.paths(), [paymob.AUTH_PATH])
+        self.assertNotEqual(self.client.auth_token(refresh=True), first)
+
+    def test_connections_are_reused(self):
+        self.client.auth_token()
+        self.client.register_order({'amount_cents': 100})
+        self.client.payment_key({'amount_cents': 100})
+        self.assertEqual(len({port for _, _, port in self.server.calls}), 1)
+
+    def test_unavailable_responses_are_retried(self):
+        self.server.failures[paymob.ORDER_PATH] = [(503, {'Retry-After': '0'}), (429, {'Retry-After': '0'})]
+        self.assertEqual(self.client.register_order({'amount_cents': 100}), {'id': 4242})
+        self.assertEqual(self.paths(), [paymob.ORDER_PATH] * 3)
+
+    def test_non_idempotent_calls_are_not_replayed(self):
+        for status in (502, 503, 504):
+            self.server.failures[paymob.ORDER_PATH] = [status]
+            with self.assertRaises(requests.HTTPError):
+                self.client.register_order({'amount_cents': 100})
+        self.assertEqual(self.paths(), [paymob.ORDER_PATH] * 3)
+
+    def test_auth_gateway_errors_are_retried(self):
+        self.server.failures[paymob.AUTH_PATH] = [502, 504]
+        self.assertTrue(self.client.auth_token())
+        self.assertEqual(self.paths(), [paymob.AUTH_PATH] * 3)
+
+    def test_retries_are_bounded(self):
+        self.server.failures[paymob.AUTH_PATH] = [503] * 10
+        client = paymob.PaymobClient(base_url=self.base_url, api_key='key', max_retries=2, backoff_factor=0)
+        self.addCleanup(client.close)
+        with self.assertRaises(requests.HTTPError):
+            client.auth_token()
+        self.assertEqual(len(self.paths()), 3)
+
+    def test_rejected_token_is_renewed_once(self):
+        stale = self.client.auth_token()
+        self.server.failures[paymob.ORDER_PATH] = [401]
+        self.assertEqual(self.client.register_order({'auth_token': stale}), {'id': 4242})
+        self.assertEqual(self.paths(), [paymob.AUTH_PATH, paymob.ORDER_PATH, paymob.AUTH_PATH, paymob.ORDER_PATH])
+        fresh = self.server.calls[-1][1]['auth_token']
+        self.assertNotEqual(fresh, stale)
+        self.assertEqual(self.client.auth_token(), fresh)
+
+        self.server.failures[paymob.ORDER_PATH] = [401, 401]
+        with self.assertRaises(requests.HTTPError):
+            self.client.register_order({'auth_token': fresh})
+        self.assertEqual(len(self.paths()), 7)
+
+    def test_service_functions_use_the_shared_client(self):
+        with override_settings(PAYMOB_BASE_URL=self.base_url, PAYMOB_INTEGRATION_ID='1'):
+            paymob.reset_client()
+            self.addCleanup(paymob.reset_client)
+            token = services.get_paymob_auth_token()
+            order_id = services.register_order('7', 1000, token)
+            key = services.get_payment_key(order_id, 1000, services.get_paymob_auth_token(), {'email': 'a@b.c'})
+        self.assertEqual(key, 'payment-key-0123456789abcdef')
+        self.assertEqual(self.paths(), [paymob.AUTH_PATH, paymob.ORDER_PATH, paymob.PAYMENT_KEY_PATH])
+
+
+def webhook_payload(txn_id, paymob_order_id, success=True, pending=False):
+    return {'type': 'TRANSACTION', 'obj': {
+        'id': txn_id, 'order': {'id': paymob_order_id}, 'success': success, 'pending': pending,
+        'error_occured': False,
+    }}
+
+
+class PaymentEventTests(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user('buyer@example.com', 'Buy', 'Er', 'pass')
+        cls.order = Order.objects.create(user=user, payment_status=Order.PENDING)
+        cls.payment = Payment.objects.create(order=cls.order, user=user, paymob_order_id=4242, payment_key='k')
+
+    def post_webhook(self, data):
+        with mock.patch.object(services, 'verify_webhook_signature', return_value=True):
+            return self.client.post('/api/payments/webhook/?hmac=x', data, content_type='application/json')
+
+    def test_webhook_only_queues(self):
+        response = self.post_webhook(webhook_payload(900, 4242))
+        self.assertEqual(response.status_code, 200)
+        self.post_webhook(webhook_payload(900, 4242))
+        event = PaymentEvent.objects.get()
+        self.assertEqual((event.transaction_id, event.paymob_order_id, event.status), ('900', 4242, PaymentEvent.PENDING))
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, 'pending')
+
+    def test_bad_signature_is_not_queued(self):
+        response = self.client.post('/api/payments/webhook/?hmac=x', webhook_payload(900, 4242),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(PaymentEvent.objects.exists())
+
+    def test_payload_without_transaction_is_rejected(self):
+        payload = webhook_payload(900, 4242)
+        del payload['obj']['id']
+        response = self.post_webhook(payload)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(PaymentEvent.objects.exists())
+
+    def test_final_callback_after_pending_is_applied(self):
+        self.post_webhook(webhook_payload(900, 4242, success=False, pending=True))
+        self.assertEqual(events.drain().processed, 1)
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, 'pending')
+
+        self.post_webhook(webhook_payload(900, 4242))
+        self.post_webhook(webhook_payload(900, 4242))
+        self.assertEqual(events.drain().processed, 1)
+        self.payment.refresh_from_db()
+        self.assertEqual((self.payment.status, self.payment.transaction_id), ('paid', '900'))
+        self.assertEqual(
+            dict(PaymentEvent.objects.values_list('outcome', 'result')),
+            {Payment.PENDING: PaymentEvent.IGNORED, Payment.PAID: PaymentEvent.APPLIED},
+        )
+
+    def test_drain_applies_each_event_once(self):
+        events.enqueue(webhook_payload(900, 4242))
+        stats = events.drain()
+        self.assertEqual((stats.processed, stats.failed, len(stats.latencies)), (1, 0, 1))
+        self.payment.refresh_from_db()
+        self.order.refresh_from_db()
+        self.assertEqual((self.payment.status, self.payment.transaction_id), ('paid', '900'))
+        self.assertEqual(self.order.payment_status, Order.COMPLETE)
+
+        events.enqueue(webhook_payload(900, 4242))
+        self.assertEqual(events.drain().processed, 0)
+        event = PaymentEvent.objects.get()
+        self.assertEqual((event.status, event.result, event.attempts), (PaymentEvent.PROCESSED, PaymentEvent.APPLIED, 1))
+        self.assertIsNotNone(event.latency)
+
+    def test_failures_are_retried_then_given_up(self):
+        events.enqueue(webhook_payload(901, 4242))
+        with mock.patch.object(services, 'process_payment_event', side_effect=RuntimeError('boom')):
+            self.assertEqual(events.drain(max_attempts=2).failed, 1)
+            self.assertEqual(PaymentEvent.objects.get().status, PaymentEvent.PENDING)
+            events.drain(max_attempts=2)
+        event = PaymentEvent.objects.get()
+        self.assertEqual((event.status, event.attempts, event.last_error), (PaymentEvent.FAILED, 2, 'boom'))
+        self.assertEqual(events.drain().failed, 0)
+
+    def test_late_failure_does_not_undo_payment(self):
+        services.process_payment_event(webhook_payload(900, 4242))
+        with self.assertNumQueries(6):
+            # The locking read and one refused conditional UPDATE inside two savepoints.
+            result = services.process_payment_event(webhook_payload(899, 4242, success=False))
+        self.assertEqual(result, PaymentEvent.IGNORED)
+        self.payment.refresh_from_db()
+        self.order.refresh_from_db()
+        self.assertEqual((self.payment.status, self.payment.transaction_id), ('paid', '900'))
+        self.assertEqual(self.order.payment_status, Order.COMPLETE)
+
+    def test_failed_payment_can_still_be_paid(self):
+        self.assertEqual(services.process_payment_event(webhook_payload(899, 4242, success=False)), PaymentEvent.APPLIED)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.payment_status, Order.FAILED)
+        self.assertEqual(services.process_payment_event(webhook_payload(900, 4242)), PaymentEvent.APPLIED)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.payment_status, Order.COMPLETE)
+
+    def test_unknown_order_is_unmatched(self):
+        self.assertEqual(services.process_payment_event(webhook_payload(900, 1)), PaymentEvent.UNMATCHED)
+
+    def test_confirm_follows_the_same_transitions(self):
+        self.client.force_authenticate(self.order.user)
+        services.process_payment_event(webhook_payload(900, 4242))
+        response = self.client.post('/api/payments/confirm/', {
+            'payment_id': self.payment.pk, 'transaction_id': '899', 'status': 'failed',
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.payment.refresh_from_db()
+        self.assertEqual((self.payment.status, self.payment.transaction_id), ('paid', '900'))
+
+    @override_settings(PAYMOB_HMAC_KEY='secret')
+    def test_signed_webhook_is_queued(self):
+        data = webhook_payload(900, 4242)
+        response = self.client.post(f'/api/payments/webhook/?hmac={services.calculate_hmac(data)}', data, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(PaymentEvent.objects.filter(transaction_id='900').exists())
+        response = self.client.post('/api/payments/webhook/?hmac=' + '0' * 128, data, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class PaymentLogTests(SimpleTestCase):
+
+    def test_redaction_is_recursive(self):
+        self.assertEqual(
+            log.redact({'auth_token': 'abc', 'obj': {'id': 1, 'source_data': {'pan': '4111'}}, 'items': [{'HMAC': 'x'}]}),
+            {'auth_token': log.REDACTED, 'obj': {'id': 1, 'source_data': {'pan': log.REDACTED}}, 'items': [{'HMAC': log.REDACTED}]},
+        )
+
+    def test_logger_is_configured(self):
+        self.assertTrue(log.logger.isEnabledFor(logging.INFO))
+        self.assertTrue(log.logger.handlers)
+
+    def test_events_carry_redacted_fields(self):
+        with self.assertLogs('payments', logging.INFO) as logs:
+            with log.timed('step', token='abc', order=7):
+                pass
+        record = logs.records[0]
+        self.assertEqual(record.payment_event, 'step')
+        self.assertEqual(record.payment_fields['token'], log.REDACTED)
+        self.assertIn('ms', record.payment_fields)
+        self.assertNotIn('abc', record.getMessage())
+
+    def test_disabled_levels_are_not_formatted(self):
+        payload = mock.MagicMock()
+        with self.assertLogs('payments', logging.INFO):
+            log.event('api_step', logging.DEBUG, payload=payload)
+            log.event('marker')
+        payload.__str__.assert_not_called()
+        payload.items.assert_not_called()
+
+    @override_settings(PAYMOB_LOG_RATE_LIMIT=3)
+    def test_rate_limit_per_event(self):
+        with self.assertLogs('payments', logging.INFO) as logs:
+            for _ in range(10):
+                log.event('noisy')
+                log.event('quiet')
+            log.event('failure', logging.ERROR)
+        names = [record.payment_event for record in logs.records]
+        self.assertEqual((names.count('noisy'), names.count('quiet'), names.count('failure')), (3, 3, 1))
+
+    @override_settings(PAYMOB_LOG_SAMPLE_RATE=0.0)
+    def test_sampling_skips_info_but_not_warnings(self):
+        with self.assertLogs('payments', logging.INFO) as logs:
+            log.event('sampled')
+            log.event('kept', logging.WARNING)
+        self.assertEqual([record.payment_event for record in logs.records], ['kept'])
+
+
+class PaymentSessionTests(StubPaymobMixin, TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('buyer@example.com', 'Buy', 'Er', 'pass')
+        cls.order = Order.objects.create(user=cls.user, payment_status=Order.PENDING, total='12.50', city='Cairo')
+
+    def setUp(self):
+        super().setUp()
+        overrides = override_settings(PAYMOB_BASE_URL=self.base_url, PAYMOB_INTEGRATION_ID='1')
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        paymob.reset_client()
+        self.addCleanup(paymob.reset_client)
+        self.client.force_authenticate(self.user)
+
+    def create_session(self, order_id):
+        return self.client.post('/api/payments/create-session/', {'order_id': order_id, 'amount_cents': 1250}, format='json')
+
+    def test_session_is_created_with_stage_timings(self):
+        with self.assertLogs('payments', logging.INFO) as logs, self.assertNumQueries(2):
+            # The order with its buyer, then the Payment INSERT.
+            response = self.create_session(self.order.pk)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['payment_key'], 'payment-key-0123456789abcdef')
+        payment = Payment.objects.get(pk=response.data['payment_id'])
+        self.assertEqual((payment.paymob_order_id, payment.status), (4242, Payment.INITIATED))
+        self.assertEqual(self.paths(), [paymob.AUTH_PATH, paymob.ORDER_PATH, paymob.PAYMENT_KEY_PATH])
+        self.assertEqual(self.server.calls[2][1]['billing_data']['email'], 'buyer@example.com')
+
+        fields = next(r.payment_fields for r in logs.records if r.payment_event == 'session_created')
+        self.assertEqual(fields['order_total_cents'], 1250)
+        for stage in ('validate', 'billing', 'auth_token', 'register_order', 'payment_key', 'persist'):
+            self.assertIn(f'{stage}_ms', fields)
+
+    def test_cached_token_is_reused(self):
+        paymob.get_client().auth_token()
+        self.create_session(self.order.pk)
+        self.assertEqual(self.paths(), [paymob.AUTH_PATH, paymob.ORDER_PATH, paymob.PAYMENT_KEY_PATH])
+
+    def test_unknown_order(self):
+        response = self.create_session(self.order.pk + 1)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['order_id'], ['Order not found.'])
+        self.assertFalse(Payment.objects.exists())
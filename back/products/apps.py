@@ -7,3 +7,4 @@ class ProductsConfig(AppConfig):
 
     def ready(self):
         import products.signals
+        import products.checks
@@ -0,0 +1,131 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+
+CATALOG_CACHE_TTL = 60 * 60 * 6
+
+CATEGORIES = 'categories'
+TAGS = 'tags'
+PRODUCTS = 'products'
+
+PUBLIC_AUDIENCE = 'public'
+ADMIN_AUDIENCE = 'admin'
+
+VERSION_KEY = 'catalog:version:{}'
+STATS_KEY = 'catalog:stats:{}:{}'
+
+# Qualified names of every view method wrapped by cache_catalog_response, for get_cache_stats().
+cached_views = []
+
+
+def _fresh_version():
+    # A timestamp rather than 1, so a version key evicted from the cache can never
+    # come back at a value that matches entries written before the eviction.
+    return time.time_ns()
+
+
+def get_versions(namespaces):
+    keys = {VERSION_KEY.format(namespace): namespace for namespace in namespaces}
+    found = cache.get_many(keys)
+    versions = {}
+    for key, namespace in keys.items():
+        version = found.get(key)
+        if version is None:
+            cache.add(key, _fresh_version(), None)
+            version = cache.get(key)
+        versions[namespace] = version
+    return versions
+
+
+def bump_versions(*namespaces):
+    """Invalidate every cached response that depends on any of ``namespaces``."""
+    for namespace in namespaces:
+        key = VERSION_KEY.format(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _fresh_version(), None)
+
+
+def get_audience(user):
+    """
+    Name the catalog variant ``user`` is allowed to see.
+
+    Anonymous visitors and buyers share one public variant (approved products only);
+    each seller additionally sees their own unapproved products; admins see everything.
+    Must stay in line with ``ProductQuerySet.visible_to``.
+    """
+    if user is None or not user.is_authenticated:
+        return PUBLIC_AUDIENCE
+    if user.is_superuser or user.role == 'admin':
+        return ADMIN_AUDIENCE
+    if user.role == 'seller':
+        return f'seller{user.pk}'
+    return PUBLIC_AUDIENCE
+
+
+def catalog_cache_key(request, namespaces, audience):
+    versions = get_versions(namespaces)
+    version_part = '.'.join(f'{namespace}{versions[namespace]}' for namespace in namespaces)
+    path = hashlib.md5(request.get_full_path().encode('utf-8')).hexdigest()
+    return f'catalog:response:{audience}:{version_part}:{path}'
+
+
+def record_lookup(view_name, hit):
+    key = STATS_KEY.format(view_name, 'hit' if hit else 'miss')
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def get_cache_stats():
+    keys = [STATS_KEY.format(view_name, outcome) for view_name in cached_views for outcome in ('hit', 'miss')]
+    counters = cache.get_many(keys)
+    return {
+        view_name: {
+            'hits': counters.get(STATS_KEY.format(view_name, 'hit'), 0),
+            'misses': counters.get(STATS_KEY.format(view_name, 'miss'), 0),
+        }
+        for view_name in cached_views
+    }
+
+
+def cache_catalog_response(*namespaces, per_audience=False, timeout=CATALOG_CACHE_TTL):
+    """
+    Cache a DRF view method's response data under the current versions of ``namespaces``.
+
+    Bumping any of those versions turns every existing entry into a miss, so entries can
+    live for hours without serving a stale catalog. The cached value is the response data,
+    not rendered bytes, so content negotiation still happens per request.
+
+    With ``per_audience`` the key also carries ``get_audience(request.user)``, so the
+    anonymous majority shares a single entry while sellers and admins get their own.
+    Responses carry an ``X-Cache: HIT``/``MISS`` header and feed ``get_cache_stats()``.
+    """
+    def decorator(view_method):
+        view_name = view_method.__qualname__
+        cached_views.append(view_name)
+
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            audience = get_audience(request.user) if per_audience else PUBLIC_AUDIENCE
+            key = catalog_cache_key(request, namespaces, audience)
+            data = cache.get(key)
+            if data is not None:
+                record_lookup(view_name, hit=True)
+                return Response(data, headers={'X-Cache': 'HIT'})
+            record_lookup(view_name, hit=False)
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                cache.set(key, response.data, timeout)
+            response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,97 @@
+"""
+System check that flags API filter and ordering paths without a supporting index.
+
+Walks every routed DRF view, resolves ``filterset_fields`` and ``ordering_fields``
+against the view's model and warns when the column is not the leading column of any
+index. Views whose queryset is always filtered on one column first (e.g. the current
+seller) name it in ``index_scope``; the second column of indexes led by that column
+then counts as well. Run with ``manage.py check``.
+"""
+from django.core.checks import Tags, Warning, register
+from django.core.exceptions import FieldDoesNotExist
+from django.urls import URLPattern, URLResolver, get_resolver
+
+
+def iter_view_classes(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_view_classes(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            view_class = getattr(pattern.callback, 'cls', None)
+            if view_class is not None:
+                yield view_class
+
+
+def get_view_model(view_class):
+    queryset = getattr(view_class, 'queryset', None)
+    if queryset is not None:
+        return queryset.model
+    serializer_class = getattr(view_class, 'serializer_class', None)
+    meta = getattr(serializer_class, 'Meta', None)
+    return getattr(meta, 'model', None)
+
+
+def leading_index_columns(model, scope=None):
+    """
+    Fields that can drive an index scan: the first column of each index, plus the
+    second column of indexes whose first column is ``scope``.
+    """
+    opts = model._meta
+    leading = {opts.pk.name}
+    for field in opts.concrete_fields:
+        if field.db_index or field.unique:
+            leading.add(field.name)
+    column_lists = [index.fields for index in opts.indexes]
+    column_lists += [fields for fields in opts.unique_together]
+    column_lists += [getattr(constraint, 'fields', None) for constraint in opts.constraints]
+    for fields in column_lists:
+        if not fields:
+            continue
+        columns = [name.lstrip('-') for name in fields]
+        leading.add(columns[0])
+        if scope and columns[0] == scope and len(columns) > 1:
+            leading.add(columns[1])
+    return leading
+
+
+def find_unindexed_paths(model, paths, scope=None):
+    leading = leading_index_columns(model, scope)
+    for path in paths:
+        name = path.lstrip('-').split('__')[0]
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # Annotations (e.g. avg_rating) are computed per query and cannot be indexed.
+            continue
+        if field.many_to_many or field.one_to_many:
+            continue
+        if field.name not in leading:
+            yield field.name
+
+
+@register(Tags.models)
+def check_filter_indexes(app_configs, **kwargs):
+    warnings = []
+    seen = set()
+    for view_class in iter_view_classes(get_resolver().url_patterns):
+        if view_class in seen:
+            continue
+        seen.add(view_class)
+        model = get_view_model(view_class)
+        if model is None:
+            continue
+        filterset_fields = getattr(view_class, 'filterset_fields', None) or []
+        ordering_fields = getattr(view_class, 'ordering_fields', None) or []
+        if ordering_fields == '__all__':
+            ordering_fields = []
+        paths = list(filterset_fields) + list(ordering_fields)
+        scope = getattr(view_class, 'index_scope', None)
+        for field_name in sorted(set(find_unindexed_paths(model, paths, scope))):
+            warnings.append(Warning(
+                f"{view_class.__name__} filters or orders on {model._meta.label}.{field_name}, "
+                f"which is not the leading column of any index.",
+                hint=f"Add a Meta.indexes entry on {model._meta.label} starting with '{field_name}'.",
+                obj=view_class,
+                id='products.W001',
+            ))
+    return warnings
@@ -0,0 +1,135 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import (
+    FileResponse,
+    HttpResponse,
+    HttpResponseNotFound,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+
+CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def make_etag(stat):
+    return f'"{stat.st_size:x}-{int(stat.st_mtime * 1_000_000):x}"'
+
+
+def parse_range(header, size):
+    """
+    Return ``(start, end)`` (inclusive) for a single ``bytes=`` range, ``None`` when the
+    header should be ignored, or ``False`` when the range cannot be satisfied.
+    Multi-range requests are answered with the whole file.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the final N bytes.
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
+
+def if_range_matches(request, etag, mtime):
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == int(mtime)
+
+
+def stream_range(path, start, length):
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = handle.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def accel_response(field_file, filename):
+    """Let the front web server send the bytes once the permission check has passed."""
+    content_type, _ = mimetypes.guess_type(filename)
+    response = HttpResponse(content_type=content_type or 'application/octet-stream')
+    if settings.PRODUCT_FILE_DELIVERY == 'nginx':
+        response['X-Accel-Redirect'] = settings.PRODUCT_FILE_ACCEL_PREFIX + quote(field_file.name)
+    else:
+        response['X-Sendfile'] = field_file.path
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    return response
+
+
+def serve_file(request, field_file):
+    """
+    Deliver a stored file as an attachment.
+
+    With ``PRODUCT_FILE_DELIVERY`` set to ``nginx`` or ``sendfile`` the transfer is handed
+    to the web server. Otherwise it is streamed from here with ETag/Last-Modified
+    validators and single ``Range``/``If-Range`` support, so interrupted downloads resume.
+    """
+    path = field_file.path
+    if not os.path.exists(path):
+        return HttpResponseNotFound('File not found')
+    filename = os.path.basename(path)
+
+    if settings.PRODUCT_FILE_DELIVERY in ('nginx', 'sendfile'):
+        return accel_response(field_file, filename)
+
+    stat = os.stat(path)
+    size = stat.st_size
+    etag = make_etag(stat)
+    last_modified = http_date(stat.st_mtime)
+
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    byte_range = None
+    range_header = request.headers.get('Range')
+    if range_header and if_range_matches(request, etag, stat.st_mtime):
+        byte_range = parse_range(range_header, size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+    elif byte_range is None:
+        response = FileResponse(open(path, 'rb'), as_attachment=True, filename=filename)
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        content_type, _ = mimetypes.guess_type(filename)
+        response = StreamingHttpResponse(
+            stream_range(path, start, length),
+            status=206,
+            content_type=content_type or 'application/octet-stream',
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(length)
+        response['Content-Disposition'] = content_disposition_header(True, filename)
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = last_modified
+    return response
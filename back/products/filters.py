@@ -0,0 +1,25 @@
+from django.db.models import F
+from rest_framework import filters
+
+
+class ProductOrderingFilter(filters.OrderingFilter):
+    """
+    ``?ordering=`` with NULLs last either way, so unrated products (``avg_rating`` is
+    NULL until the first review) sort after rated ones instead of ahead of them on
+    Postgres.
+    """
+    nullable_fields = ('avg_rating',)
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if not ordering:
+            return queryset
+        return queryset.order_by(*[self.order_expression(term) for term in ordering])
+
+    def order_expression(self, term):
+        field = term.lstrip('-')
+        if field not in self.nullable_fields:
+            return term
+        if term.startswith('-'):
+            return F(field).desc(nulls_last=True)
+        return F(field).asc(nulls_last=True)
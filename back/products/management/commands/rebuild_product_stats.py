@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from accounts import favorites
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored rating, flag and favorite counters on every product."
+
+    def handle(self, *args, **options):
+        updated = Product.objects.all().rebuild_review_stats()
+        favorites.rebuild_counts()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt review stats for {updated} products."))
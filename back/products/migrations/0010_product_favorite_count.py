@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-17 22:29
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_favorite_count(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    Favorite = apps.get_model('accounts', 'Favorite')
+    favorites = Favorite.objects.filter(product=OuterRef('pk')).order_by().values('product')
+    Product.objects.update(
+        favorite_count=Coalesce(
+            Subquery(favorites.annotate(total=Count('id')).values('total'), output_field=IntegerField()), 0
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_favorite'),
+        ('products', '0009_product_product_created_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='favorite_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-favorite_count'], name='product_favorite_count_idx'),
+        ),
+        migrations.RunPython(backfill_favorite_count, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,8 @@ from django.db import models
 from django.conf import settings
 from django.utils.text import slugify
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.db.models import Count, F, FloatField, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce, NullIf
 
 
 User = settings.AUTH_USER_MODEL
@@ -27,6 +29,39 @@ class Tag(models.Model):
         return self.name
 
 
+class ProductQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """Approved products, plus a seller's own drafts; admins see everything."""
+        if user is None or not user.is_authenticated:
+            return self.filter(is_approved=True)
+        if user.is_superuser or user.role == 'admin':
+            return self
+        if user.role == 'seller':
+            return self.filter(models.Q(is_approved=True) | models.Q(seller=user))
+        return self.filter(is_approved=True)
+
+    def with_review_stats(self):
+        """Expose the stored rating counters as review_count and avg_rating (no review scan)."""
+        return self.annotate(
+            review_count=F('rating_count'),
+            avg_rating=Cast('rating_sum', FloatField()) / NullIf(F('rating_count'), 0),
+        )
+
+    def rebuild_review_stats(self):
+        """Recompute rating_sum, rating_count and flag_count from the review and flag tables."""
+        reviews = ProductReview.objects.filter(product=OuterRef('pk')).order_by().values('product')
+        flags = ProductFlag.objects.filter(product=OuterRef('pk')).order_by().values('product')
+        return self.update(
+            rating_sum=Coalesce(Subquery(reviews.annotate(total=Sum('rating')).values('total')), 0),
+            rating_count=Coalesce(
+                Subquery(reviews.annotate(total=Count('id')).values('total'), output_field=IntegerField()), 0
+            ),
+            flag_count=Coalesce(
+                Subquery(flags.annotate(total=Count('id')).values('total'), output_field=IntegerField()), 0
+            ),
+        )
+
+
 class Product(models.Model):
     seller = models.ForeignKey(User, on_delete=models.CASCADE, related_name='products')
     title = models.CharField(max_length=255)
@@ -44,11 +79,42 @@ class Product(models.Model):
     is_featured = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Maintained incrementally by products.signals; rebuild with `manage.py rebuild_product_stats`.
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    flag_count = models.PositiveIntegerField(default=0, editable=False)
+    # Maintained by accounts.signals as favorites are added and removed.
+    favorite_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = ProductQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Latest products and the default listing order.
+            models.Index(fields=['-created_at'], name='product_created_idx'),
+            # Public listings: approved only, newest first.
+            models.Index(fields=['is_approved', '-created_at'], name='product_approved_created_idx'),
+            models.Index(fields=['price'], name='product_price_idx'),
+            models.Index(fields=['-rating_count'], name='product_rating_count_idx'),
+            models.Index(fields=['-favorite_count'], name='product_favorite_count_idx'),
+            # The featured strip only ever reads the handful of featured rows.
+            models.Index(
+                fields=['-created_at'], name='product_featured_idx', condition=models.Q(is_featured=True)
+            ),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
         super().save(*args, **kwargs)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Remember the stored price so signals can drop cart totals built from it.
+        instance = super().from_db(db, field_names, values)
+        instance._stored_price = instance.__dict__.get('price')
+        return instance
+
     def __str__(self):
         return self.title
 
@@ -63,6 +129,14 @@ class ProductReview(models.Model):
     class Meta:
         unique_together = ('product', 'user')
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Remember what was stored so signals can apply the delta to the product counters.
+        instance = super().from_db(db, field_names, values)
+        instance._stored_rating = instance.__dict__.get('rating')
+        instance._stored_product_id = instance.__dict__.get('product_id')
+        return instance
+
 
 class ProductFlag(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='flags')
@@ -71,4 +145,10 @@ class ProductFlag(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        unique_together = ('product', 'user')
\ No newline at end of file
+        unique_together = ('product', 'user')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stored_product_id = instance.__dict__.get('product_id')
+        return instance
@@ -1,18 +1,169 @@
-from rest_framework.pagination import PageNumberPagination
-
+import base64
+import json
 
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on ``(ordering field, id)``.
+
+    Each page is a single indexed range scan, so page 50 costs the same as page 1.
+    Cursors are opaque base64 tokens; the total count is only computed when the
+    client asks for it with ``?count=true``.
+
+    Only the ``orderings`` listed on the class are honoured; any other ``?ordering=``
+    falls back to ``default_ordering``. Each must name a non-null model field, since a
+    NULL cursor value has no place in the range comparison.
+    """
+    cursor_query_param = 'cursor'
+    ordering_param = 'ordering'
+    count_query_param = 'count'
+    page_size = 6
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    orderings = ('-created_at', 'created_at')
+    default_ordering = '-created_at'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = remove_query_param(request.build_absolute_uri(), 'page')
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request)
+        self.field = self.ordering.lstrip('-')
+        self.descending = self.ordering.startswith('-')
+        self.count = queryset.count() if self.count_requested(request) else None
+
+        cursor = self.decode_cursor(request, queryset.model)
+        self.cursor = cursor
+        backwards = bool(cursor and cursor['r'])
+
+        # Walking backwards is the same range scan with the ordering flipped.
+        descending = self.descending != backwards
+        direction = '-' if descending else ''
+        queryset = queryset.order_by(f'{direction}{self.field}', f'{direction}id')
+
+        if cursor is not None:
+            lookup = 'lt' if descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{self.field}__{lookup}': cursor['v']}) |
+                Q(**{self.field: cursor['v'], f'id__{lookup}': cursor['id']})
+            )
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if backwards:
+            rows.reverse()
+
+        self.has_next = has_more if not backwards else True
+        self.has_previous = has_more if backwards else cursor is not None
+        self.first = rows[0] if rows else None
+        self.last = rows[-1] if rows else None
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_ordering(self, request):
+        ordering = request.query_params.get(self.ordering_param, '').strip()
+        return ordering if ordering in self.orderings else self.default_ordering
+
+    def count_requested(self, request):
+        return request.query_params.get(self.count_query_param, '').lower() in ('1', 'true', 'yes')
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            if cursor['o'] != self.ordering or cursor['v'] is None:
+                raise ValueError
+            # Coerced here so a tampered value fails as a bad cursor, not inside the query.
+            value = model._meta.get_field(self.field).to_python(cursor['v'])
+            return {'v': value, 'id': int(cursor['id']), 'r': bool(cursor['r'])}
+        except (TypeError, ValueError, KeyError, UnicodeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, instance, reverse):
+        value = getattr(instance, self.field)
+        payload = {
+            'o': self.ordering,
+            'v': value.isoformat() if hasattr(value, 'isoformat') else str(value),
+            'id': instance.pk,
+            'r': reverse,
+        }
+        encoded = base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded.decode('ascii'))
+
+    def get_next_link(self):
+        if not self.has_next or self.last is None:
+            return None
+        return self.encode_cursor(self.last, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or self.first is None:
+            return None
+        return self.encode_cursor(self.first, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.count,
+            'page_size': self.page_size,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data
+        })
+
+
+class ProductCursorPagination(KeysetPagination):
+    orderings = ('-created_at', 'created_at', '-price', 'price')
+
 
 class ProductPagination(PageNumberPagination):
+    """
+    Page-number pagination by default; switches to keyset mode when the client
+    sends ``?cursor=`` or ``?pagination=cursor`` (infinite scroll, deep pages).
+    """
     page_size = 6
     page_size_query_param = "page_size"
     max_page_size = 100
+    mode_query_param = 'pagination'
+    cursor_class = ProductCursorPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.cursor_requested(request):
+            self.keyset = self.cursor_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def cursor_requested(self, request):
+        return (
+            self.cursor_class.cursor_query_param in request.query_params
+            or request.query_params.get(self.mode_query_param) == 'cursor'
+        )
 
     def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
         return Response({
             'count': self.page.paginator.count,
             'page_size': self.get_page_size(self.request),
             'next': self.get_next_link(),
             'previous': self.get_previous_link(),
             'results': data
-        })
\ No newline at end of file
+        })
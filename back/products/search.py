@@ -0,0 +1,148 @@
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+
+POSTGRES_INDEX_TABLE = 'products_productsearchindex'
+SQLITE_INDEX_TABLE = 'products_product_fts'
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(query):
+    """Split a raw search string into lowercase word tokens."""
+    return [token.lower() for token in TOKEN_RE.findall(query or '')]
+
+
+class PostgresSearchBackend:
+    """tsvector document per product, stored in a GIN-indexed side table."""
+
+    document_sql = (
+        "setweight(to_tsvector('english', coalesce(p.title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(p.description, '')), 'B')"
+    )
+
+    def build_query(self, tokens):
+        # Every term must match; each one is a prefix so partial words hit as the user types.
+        return ' & '.join(f'{token}:*' for token in tokens)
+
+    def index_product(self, product_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {POSTGRES_INDEX_TABLE} (product_id, document) "
+                f"SELECT p.id, {self.document_sql} FROM products_product p WHERE p.id = %s "
+                f"ON CONFLICT (product_id) DO UPDATE SET document = EXCLUDED.document",
+                [product_id],
+            )
+
+    def remove_product(self, product_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {POSTGRES_INDEX_TABLE} WHERE product_id = %s", [product_id])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {POSTGRES_INDEX_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {POSTGRES_INDEX_TABLE} (product_id, document) "
+                f"SELECT p.id, {self.document_sql} FROM products_product p"
+            )
+
+    def search(self, queryset, tokens):
+        query = self.build_query(tokens)
+        matches = RawSQL(
+            f"SELECT product_id FROM {POSTGRES_INDEX_TABLE} "
+            f"WHERE document @@ to_tsquery('english', %s)",
+            [query],
+        )
+        rank = RawSQL(
+            f"SELECT ts_rank(document, to_tsquery('english', %s)) FROM {POSTGRES_INDEX_TABLE} "
+            f"WHERE product_id = {queryset.model._meta.db_table}.id",
+            [query],
+            output_field=FloatField(),
+        )
+        return queryset.filter(pk__in=matches).annotate(search_rank=rank).order_by('-search_rank', '-id')
+
+
+class SQLiteSearchBackend:
+    """FTS5 virtual table keyed by product id, used for local sqlite runs."""
+
+    def build_query(self, tokens):
+        return ' '.join(f'"{token}"*' for token in tokens)
+
+    def index_product(self, product_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SQLITE_INDEX_TABLE} WHERE rowid = %s", [product_id])
+            cursor.execute(
+                f"INSERT INTO {SQLITE_INDEX_TABLE} (rowid, title, description) "
+                f"SELECT id, title, description FROM products_product WHERE id = %s",
+                [product_id],
+            )
+
+    def remove_product(self, product_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SQLITE_INDEX_TABLE} WHERE rowid = %s", [product_id])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SQLITE_INDEX_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {SQLITE_INDEX_TABLE} (rowid, title, description) "
+                f"SELECT id, title, description FROM products_product"
+            )
+
+    def search(self, queryset, tokens):
+        query = self.build_query(tokens)
+        matches = RawSQL(
+            f"SELECT rowid FROM {SQLITE_INDEX_TABLE} WHERE {SQLITE_INDEX_TABLE} MATCH %s",
+            [query],
+        )
+        # bm25() is lower-is-better; title hits weigh ten times description hits.
+        rank = RawSQL(
+            f"SELECT -bm25({SQLITE_INDEX_TABLE}, 10.0, 1.0) FROM {SQLITE_INDEX_TABLE} "
+            f"WHERE {SQLITE_INDEX_TABLE} MATCH %s AND rowid = {queryset.model._meta.db_table}.id",
+            [query],
+            output_field=FloatField(),
+        )
+        return queryset.filter(pk__in=matches).annotate(search_rank=rank).order_by('-search_rank', '-id')
+
+
+class LikeSearchBackend:
+    """Unindexed fallback for databases without a full-text engine."""
+
+    def index_product(self, product_id):
+        pass
+
+    def remove_product(self, product_id):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def search(self, queryset, tokens):
+        for token in tokens:
+            queryset = queryset.filter(Q(title__icontains=token) | Q(description__icontains=token))
+        return queryset
+
+
+def get_search_backend():
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    if connection.vendor == 'sqlite':
+        return SQLiteSearchBackend()
+    return LikeSearchBackend()
+
+
+class ProductSearchFilter(filters.SearchFilter):
+    """Drop-in replacement for SearchFilter that queries the product search index.
+
+    Results come back ordered by relevance unless an explicit ``ordering`` is requested.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        tokens = tokenize(request.query_params.get(self.search_param, ''))
+        if not tokens:
+            return queryset
+        return get_search_backend().search(queryset, tokens)
@@ -55,3 +55,41 @@ class ProductSerializer(serializers.ModelSerializer):
             'price', 'is_in_subscription', 'is_approved', 'is_featured',
             'created_at', 'reviews', 'flags'
         ]
+
+
+class ProductListSerializer(serializers.ModelSerializer):
+    """Grid/card representation: review stats instead of the nested reviews and flags.
+
+    Expects a queryset built with ``Product.objects.with_review_stats()``.
+    """
+    seller = UserPublicSerializer(read_only=True)
+    category_name = serializers.CharField(source='category.name', read_only=True)
+    tags_names = serializers.SlugRelatedField(
+        many=True, read_only=True, slug_field='name', source='tags'
+    )
+    review_count = serializers.IntegerField(read_only=True)
+    avg_rating = serializers.FloatField(read_only=True)
+    flag_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Product
+        fields = [
+            'id', 'seller', 'title', 'description', 'category', 'category_name', 'tags_names',
+            'file', 'preview_video', 'photo', 'live_demo_url',
+            'price', 'is_in_subscription', 'is_approved', 'is_featured',
+            'created_at', 'review_count', 'avg_rating', 'flag_count', 'favorite_count'
+        ]
+
+
+class ProductCardSerializer(serializers.ModelSerializer):
+    """Compact card for product references (favorites, wishlists): no seller, tags or files.
+
+    Expects ``Product.objects.with_review_stats().select_related('category')``.
+    """
+    category_name = serializers.CharField(source='category.name', read_only=True)
+    review_count = serializers.IntegerField(read_only=True)
+    avg_rating = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Product
+        fields = ['id', 'title', 'slug', 'photo', 'price', 'category_name', 'review_count', 'avg_rating']
@@ -1,18 +1,103 @@
-from django.core.cache import cache
-from django.db.models.signals import post_save, post_delete
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
-from .models import Product, Category, Tag
+from .models import Product, Category, Tag, ProductReview, ProductFlag
+from .cache import bump_versions, CATEGORIES, TAGS, PRODUCTS
+from .search import get_search_backend
 
+SEARCHABLE_FIELDS = {'title', 'description'}
+
+
+# Product listings embed category names, tag names and review stats, so those changes
+# invalidate the product namespace as well as their own.
 @receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=ProductReview)
+@receiver([post_save, post_delete], sender=ProductFlag)
+@receiver(m2m_changed, sender=Product.tags.through)
+def invalidate_product_cache(sender, **kwargs):
+    bump_versions(PRODUCTS)
+
+
 @receiver([post_save, post_delete], sender=Category)
+def invalidate_category_cache(sender, **kwargs):
+    bump_versions(CATEGORIES)
+
+
 @receiver([post_save, post_delete], sender=Tag)
-def clear_cache_on_change(sender, **kwargs):
-    cache_keys = [
-        'product_list',
-        'category_list',
-        'tag_list',
-        'latest_products',
-    ]
-    
-    for key in cache_keys:
-        cache.delete(key)
+def invalidate_tag_cache(sender, **kwargs):
+    bump_versions(TAGS)
+
+
+@receiver(post_save, sender=Product)
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    # Saves that only touch flags like is_featured/is_approved leave the document unchanged.
+    if update_fields is not None and not SEARCHABLE_FIELDS.intersection(update_fields):
+        return
+    get_search_backend().index_product(instance.pk)
+
+
+@receiver(post_delete, sender=Product)
+def remove_from_search_index(sender, instance, **kwargs):
+    get_search_backend().remove_product(instance.pk)
+
+
+def adjust_rating(product_id, rating_delta, count_delta):
+    products = Product.objects.filter(pk=product_id)
+    # Never take the counters below zero; a decrement that would (a double delete, or
+    # rows that were bulk-created without a rebuild) recounts the product instead.
+    guarded = products
+    if count_delta < 0:
+        guarded = guarded.filter(rating_count__gte=-count_delta)
+    if rating_delta < 0:
+        guarded = guarded.filter(rating_sum__gte=-rating_delta)
+    updated = guarded.update(
+        rating_sum=F('rating_sum') + rating_delta,
+        rating_count=F('rating_count') + count_delta,
+    )
+    if not updated and (count_delta < 0 or rating_delta < 0):
+        products.rebuild_review_stats()
+
+
+def decrement_flag_count(product_id):
+    Product.objects.filter(pk=product_id, flag_count__gt=0).update(flag_count=F('flag_count') - 1)
+
+
+@receiver(post_save, sender=ProductReview)
+def update_rating_on_save(sender, instance, created, **kwargs):
+    stored_rating = getattr(instance, '_stored_rating', None)
+    stored_product_id = getattr(instance, '_stored_product_id', None)
+    if created:
+        adjust_rating(instance.product_id, instance.rating, 1)
+    elif stored_rating is None or stored_product_id is None:
+        # Saved without having been loaded first, so the previous rating is unknown.
+        Product.objects.filter(pk=instance.product_id).rebuild_review_stats()
+    elif stored_product_id != instance.product_id:
+        adjust_rating(stored_product_id, -stored_rating, -1)
+        adjust_rating(instance.product_id, instance.rating, 1)
+    elif stored_rating != instance.rating:
+        adjust_rating(instance.product_id, instance.rating - stored_rating, 0)
+    instance._stored_rating = instance.rating
+    instance._stored_product_id = instance.product_id
+
+
+@receiver(post_delete, sender=ProductReview)
+def update_rating_on_delete(sender, instance, **kwargs):
+    rating = getattr(instance, '_stored_rating', None)
+    product_id = getattr(instance, '_stored_product_id', None) or instance.product_id
+    adjust_rating(product_id, -(instance.rating if rating is None else rating), -1)
+
+
+@receiver(post_save, sender=ProductFlag)
+def update_flag_count_on_save(sender, instance, created, **kwargs):
+    stored_product_id = getattr(instance, '_stored_product_id', None)
+    if created:
+        Product.objects.filter(pk=instance.product_id).update(flag_count=F('flag_count') + 1)
+    elif stored_product_id is not None and stored_product_id != instance.product_id:
+        decrement_flag_count(stored_product_id)
+        Product.objects.filter(pk=instance.product_id).update(flag_count=F('flag_count') + 1)
+    instance._stored_product_id = instance.product_id
+
+
+@receiver(post_delete, sender=ProductFlag)
+def update_flag_count_on_delete(sender, instance, **kwargs):
+    decrement_flag_count(getattr(instance, '_stored_product_id', None) or instance.product_id)
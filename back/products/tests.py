@@ -1,3 +1,379 @@
-from django.test import TestCase
+import base64
+import json
+import os
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import override_settings
+from django.utils.http import http_date
+from rest_framework.test import APITestCase
+
+from accounts.models import Favorite
+from webify.testing import QueryBudgetTestCase, make_users
+
+from .models import Category, Product, ProductFlag, ProductReview
+
+
+def make_product(seller, title, description='A template.', **fields):
+    fields.setdefault('is_approved', True)
+    fields.setdefault('price', 10)
+    return Product.objects.create(
+        seller=seller, title=title, slug=title.lower().replace(' ', '-'), description=description,
+        file='products/files/test.zip', **fields
+    )
+
+
+class ProductEndpointBudgetTests(QueryBudgetTestCase):
+
+    def test_category_list(self):
+        self.assertBudget('/api/categories/', queries=1, ms=200)
+
+    def test_category_detail(self):
+        self.assertBudget(f'/api/categories/{self.data.categories[0].pk}/', queries=1, ms=100)
+
+    def test_tag_list(self):
+        self.assertBudget('/api/tags/', queries=1, ms=200)
+
+    def test_tag_detail(self):
+        self.assertBudget(f'/api/tags/{self.data.tags[0].pk}/', queries=1, ms=100)
+
+    def test_product_list(self):
+        self.assertBudget('/api/products/', queries=3, ms=300)
+
+    def test_product_list_is_cached(self):
+        self.assertBudget('/api/products/', queries=3, ms=300)
+        response = self.assertBudget('/api/products/', queries=0, ms=100)
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_product_list_marks_favorites(self):
+        buyer = self.data.buyer
+        self.assertBudget('/api/products/', queries=3, ms=300)
+        # Shared cached page; the buyer's favorite set costs one query, then none.
+        response = self.assertBudget('/api/products/', queries=1, ms=100, user=buyer)
+        favorited = set(buyer.favorites.values_list('product_id', flat=True))
+        for product in response.data['results']:
+            self.assertEqual(product['is_favorited'], product['id'] in favorited)
+        self.assertBudget('/api/products/', queries=0, ms=100, user=buyer)
+
+    def test_product_list_deep_cursor_page(self):
+        response = self.assertBudget('/api/products/?pagination=cursor&page_size=50', queries=2, ms=300)
+        for _ in range(10):
+            response = self.assertBudget(response.data['next'], queries=2, ms=300)
+
+    def test_product_search(self):
+        self.assertBudget('/api/products/?search=dashboard', queries=3, ms=300)
+
+    def test_product_detail(self):
+        self.assertBudget(f'/api/products/{self.data.product.pk}/', queries=5, ms=200)
+
+    def test_featured_products(self):
+        self.assertBudget('/api/products/featured/', queries=2, ms=200)
+
+    def test_top_rated_products(self):
+        self.assertBudget('/api/products/top_rated/', queries=2, ms=300)
+
+    def test_product_reviews_page(self):
+        self.assertBudget(f'/api/products/{self.data.product.pk}/reviews/', queries=4, ms=200)
+
+    def test_owned_products(self):
+        self.assertBudget('/api/products/owned/', queries=1, ms=100, user=self.data.buyer)
+
+    def test_download_permission_check(self):
+        # The seeded files do not exist on disk; the budget covers the access checks.
+        self.assertBudget(
+            f'/api/products/{self.data.product.pk}/download/', queries=2, ms=200,
+            user=self.data.admin, status=404,
+        )
+
+    def test_latest_products(self):
+        self.assertBudget('/api/latest-products/', queries=2, ms=200)
+
+    def test_product_review_list_for_product(self):
+        self.assertBudget(f'/api/product-reviews/?product={self.data.product.pk}', queries=2, ms=200)
+
+    def test_product_review_list(self):
+        self.assertBudget('/api/product-reviews/', queries=1, ms=2000)
+
+    def test_product_flag_list(self):
+        self.assertBudget('/api/product-flags/', queries=1, ms=300)
+
+    def test_catalog_cache_stats(self):
+        self.assertBudget('/api/catalog-cache-stats/', queries=0, ms=100, user=self.data.admin)
+
+
+class ProductSearchTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        seller = make_users('seller', 1, role='seller')[0]
+        cls.title_hit = make_product(seller, 'Dashboard Starter', 'Admin panel with charts.')
+        cls.description_hit = make_product(seller, 'Landing Kit', 'Marketing page with a dashboard preview.')
+        cls.other = make_product(seller, 'Shop Theme', 'Storefront with a cart.')
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self, query):
+        response = self.client.get('/api/products/', {'search': query})
+        self.assertEqual(response.status_code, 200)
+        return [product['id'] for product in response.data['results']]
+
+    def test_title_hits_rank_above_description_hits(self):
+        self.assertEqual(self.search('dashboard'), [self.title_hit.pk, self.description_hit.pk])
+
+    def test_description_terms_match(self):
+        self.assertEqual(self.search('storefront'), [self.other.pk])
+
+    def test_every_term_must_match(self):
+        self.assertEqual(self.search('landing dashboard'), [self.description_hit.pk])
+        self.assertEqual(self.search('shop dashboard'), [])
+
+    def test_terms_match_as_prefixes(self):
+        self.assertEqual(self.search('dash'), [self.title_hit.pk, self.description_hit.pk])
+
+    def test_index_follows_edits(self):
+        self.other.title = 'Dashboard Shop'
+        self.other.save()
+        self.assertIn(self.other.pk, self.search('dashboard'))
+        self.other.delete()
+        self.assertNotIn(self.other.pk, self.search('dashboard'))
+
+
+class ProductCursorTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        seller = make_users('seller', 1, role='seller')[0]
+        cls.products = [make_product(seller, f'Template {index}', price=10 + index) for index in range(5)]
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, **params):
+        return self.client.get('/api/products/', {'pagination': 'cursor', 'page_size': 2, **params})
+
+    def cursor(self, **payload):
+        return base64.urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('ascii')
+
+    def test_pages_follow_the_ordering(self):
+        response = self.get(ordering='price')
+        seen = [product['id'] for product in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            seen += [product['id'] for product in response.data['results']]
+        self.assertEqual(seen, [product.pk for product in self.products])
+
+    def test_tampered_cursor_values_are_rejected(self):
+        for ordering, value in (('-created_at', 'yesterday'), ('price', 'cheap'), ('price', None), ('price', [1])):
+            response = self.get(ordering=ordering, cursor=self.cursor(o=ordering, v=value, id=1, r=False))
+            self.assertEqual(response.status_code, 404, (ordering, value))
+            self.assertEqual(str(response.data['detail']), 'Invalid cursor')
+
+    def test_unsupported_ordering_falls_back_to_default(self):
+        response = self.get(ordering='title')
+        self.assertEqual(
+            [product['id'] for product in response.data['results']],
+            [product.pk for product in self.products[::-1][:2]],
+        )
+
+
+class CatalogCacheTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller, cls.other_seller = make_users('seller', 2, role='seller')
+        cls.buyer = make_users('buyer', 1)[0]
+        cls.admin = make_users('admin', 1, role='admin', is_staff=True, is_superuser=True)[0]
+        cls.category = Category.objects.create(name='Dashboards', slug='dashboards')
+        cls.approved = make_product(cls.seller, 'Approved Template', category=cls.category)
+        cls.draft = make_product(cls.seller, 'Draft Template', is_approved=False)
+
+    def setUp(self):
+        cache.clear()
+
+    def list_as(self, user=None):
+        self.client.force_authenticate(user)
+        response = self.client.get('/api/products/')
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def ids(self, response):
+        return {product['id'] for product in response.data['results']}
+
+    def test_audiences_get_separate_entries(self):
+        public = {self.approved.pk}
+        with_draft = {self.approved.pk, self.draft.pk}
+
+        self.assertEqual(self.ids(self.list_as(self.seller)), with_draft)
+        for user in (None, self.buyer, self.other_seller):
+            response = self.list_as(user)
+            self.assertEqual(self.ids(response), public, user)
+        self.assertEqual(self.ids(self.list_as(self.admin)), with_draft)
+
+        # Second round: all served from the cache, still per audience.
+        for user, expected in ((None, public), (self.buyer, public), (self.other_seller, public),
+                               (self.seller, with_draft), (self.admin, with_draft)):
+            response = self.list_as(user)
+            self.assertEqual(response['X-Cache'], 'HIT', user)
+            self.assertEqual(self.ids(response), expected, user)
+
+    def test_product_write_invalidates(self):
+        self.list_as()
+        self.assertEqual(self.list_as()['X-Cache'], 'HIT')
+        self.approved.title = 'Renamed Template'
+        self.approved.save()
+        response = self.list_as()
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['title'], 'Renamed Template')
+
+        self.draft.is_approved = True
+        self.draft.save(update_fields=['is_approved'])
+        self.assertEqual(self.ids(self.list_as()), {self.approved.pk, self.draft.pk})
+
+    def test_review_write_invalidates(self):
+        self.list_as()
+        review = ProductReview.objects.create(product=self.approved, user=self.buyer, rating=4, comment='Good.')
+        product = self.list_as().data['results'][0]
+        self.assertEqual((product['review_count'], product['avg_rating']), (1, 4.0))
+        review.delete()
+        product = self.list_as().data['results'][0]
+        self.assertEqual(product['review_count'], 0)
+
+    def test_favorite_write_keeps_listing_cached(self):
+        self.assertEqual(self.list_as().data['results'][0]['favorite_count'], 0)
+        favorite = Favorite.objects.create(user=self.buyer, product=self.approved)
+        response = self.list_as()
+        self.assertEqual((response['X-Cache'], response.data['results'][0]['favorite_count']), ('HIT', 1))
+        favorite.delete()
+        response = self.list_as()
+        self.assertEqual((response['X-Cache'], response.data['results'][0]['favorite_count']), ('HIT', 0))
+
+    def test_category_write_invalidates(self):
+        self.list_as()
+        self.category.name = 'Admin Panels'
+        self.category.save()
+        self.assertEqual(self.list_as().data['results'][0]['category_name'], 'Admin Panels')
+
+
+class ProductCounterTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = make_users('seller', 1, role='seller')[0]
+        cls.buyer = make_users('buyer', 1)[0]
+        cls.product = make_product(cls.seller, 'Counted Template')
+        ProductReview.objects.create(product=cls.product, user=cls.seller, rating=5, comment='Mine.')
+
+    def counters(self):
+        self.product.refresh_from_db()
+        return self.product.rating_sum, self.product.rating_count, self.product.flag_count
+
+    def test_create_then_delete_leaves_counters_unchanged(self):
+        before = self.counters()
+        review = ProductReview.objects.create(product=self.product, user=self.buyer, rating=2, comment='Meh.')
+        flag = ProductFlag.objects.create(product=self.product, user=self.buyer, reason='Broken link')
+        self.assertEqual(self.counters(), (7, 2, 1))
+        review.delete()
+        flag.delete()
+        self.assertEqual(self.counters(), before)
+
+    def test_double_delete_does_not_go_negative(self):
+        self.product = make_product(self.seller, 'Unreviewed Template')
+        flag = ProductFlag.objects.create(product=self.product, user=self.buyer, reason='Broken link')
+        review = ProductReview.objects.create(product=self.product, user=self.buyer, rating=2, comment='Meh.')
+        # Two requests that both loaded the row before either deleted it.
+        for model, pk in ((ProductFlag, flag.pk), (ProductReview, review.pk)):
+            first, second = model.objects.get(pk=pk), model.objects.get(pk=pk)
+            first.delete()
+            second.delete()
+        self.assertEqual(self.counters(), (0, 0, 0))
+
+    def test_delete_of_uncounted_rows_recounts(self):
+        # Bulk inserts skip the signals, so these rows were never counted.
+        ProductFlag.objects.bulk_create([ProductFlag(product=self.product, user=self.buyer, reason='Spam')])
+        ProductReview.objects.bulk_create([ProductReview(product=self.product, user=self.buyer, rating=1, comment='No.')])
+        ProductFlag.objects.get(product=self.product).delete()
+        ProductReview.objects.get(product=self.product, user=self.buyer).delete()
+        ProductReview.objects.get(product=self.product, user=self.seller).delete()
+        self.assertEqual(self.counters(), (0, 0, 0))
+
+    def test_unrated_products_sort_last(self):
+        cache.clear()
+        unrated = make_product(self.seller, 'Unrated Template')
+        rated = make_product(self.seller, 'Rated Template')
+        ProductReview.objects.create(product=rated, user=self.buyer, rating=2, comment='Meh.')
+        for ordering, expected in (('avg_rating', [rated, self.product]), ('-avg_rating', [self.product, rated])):
+            response = self.client.get('/api/products/', {'ordering': ordering})
+            ids = [product['id'] for product in response.data['results']]
+            self.assertEqual(ids, [product.pk for product in expected + [unrated]], ordering)
+
+
+class ProductDownloadTests(APITestCase):
+    content = bytes(range(256)) * 40
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.media_root)
+        os.makedirs(os.path.join(cls.media_root, 'products', 'files'))
+        with open(os.path.join(cls.media_root, 'products', 'files', 'test.zip'), 'wb') as handle:
+            handle.write(cls.content)
+        cls.enterClassContext(override_settings(MEDIA_ROOT=cls.media_root, PRODUCT_FILE_DELIVERY='django'))
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = make_users('seller', 1, role='seller')[0]
+        cls.product = make_product(cls.seller, 'Downloadable Template')
+
+    def setUp(self):
+        self.client.force_authenticate(self.seller)
+        self.url = f'/api/products/{self.product.pk}/download/'
+
+    def download(self, **headers):
+        response = self.client.get(self.url, headers=headers)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_full_download_carries_validators(self):
+        response, body = self.download()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.content)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertTrue(response['ETag'])
+        self.assertTrue(response['Last-Modified'])
+
+    def test_single_range(self):
+        response, body = self.download(Range='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, self.content[100:200])
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{len(self.content)}')
+        self.assertEqual(response['Content-Length'], '100')
+
+    def test_open_and_suffix_ranges(self):
+        response, body = self.download(Range=f'bytes={len(self.content) - 10}-')
+        self.assertEqual((response.status_code, body), (206, self.content[-10:]))
+        response, body = self.download(Range='bytes=-25')
+        self.assertEqual((response.status_code, body), (206, self.content[-25:]))
+
+    def test_unsatisfiable_range(self):
+        response, _ = self.download(Range=f'bytes={len(self.content)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.content)}')
+
+    def test_if_range_mismatch_sends_whole_file(self):
+        etag = self.download()[0]['ETag']
+        response, body = self.download(Range='bytes=0-9', **{'If-Range': '"stale"'})
+        self.assertEqual((response.status_code, body), (200, self.content))
+        response, body = self.download(Range='bytes=0-9', **{'If-Range': etag})
+        self.assertEqual((response.status_code, body), (206, self.content[:10]))
+        response, body = self.download(Range='bytes=0-9', **{'If-Range': http_date(0)})
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_none_match(self):
+        etag = self.download()[0]['ETag']
+        response, body = self.download(**{'If-None-Match': etag})
+        self.assertEqual((response.status_code, body), (304, b''))
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(self.download(**{'If-None-Match': '"other"'})[0].status_code, 200)
@@ -7,6 +7,7 @@ from .views import (
     ProductReviewViewSet,
     ProductFlagViewSet,
     LatestProductsViewSet,
+    CatalogCacheStatsView,
 )
 
 router = DefaultRouter()
@@ -16,4 +17,6 @@ router.register(r'products', ProductViewSet, basename='product')
 router.register(r'latest-products', LatestProductsViewSet, basename='latest-products')
 router.register(r'product-reviews', ProductReviewViewSet, basename='product-review')
 router.register(r'product-flags', ProductFlagViewSet, basename='product-flag')
-urlpatterns = router.urls
\ No newline at end of file
+urlpatterns = [
+    path('catalog-cache-stats/', CatalogCacheStatsView.as_view(), name='catalog-cache-stats'),
+] + router.urls
\ No newline at end of file
@@ -1,33 +1,33 @@
 from rest_framework.viewsets import ModelViewSet
+from rest_framework.views import APIView
 from rest_framework import serializers, status, permissions
 from .models import Category, Tag, Product, ProductReview, ProductFlag
 from .serializers import (
     CategorySerializer,
     TagSerializer,
     ProductSerializer,
+    ProductListSerializer,
     ProductReviewSerializer,
     ProductFlagSerializer,
 )
 from .pagination import ProductPagination
+from .search import ProductSearchFilter
+from .filters import ProductOrderingFilter
+from .downloads import serve_file
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters
+from django.db.models import F
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.http import FileResponse, HttpResponseNotFound
-from orders.models import OrderItem
-import os
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
+from orders import entitlements
+from accounts import favorites
+from .cache import cache_catalog_response, get_cache_stats, CATEGORIES, TAGS, PRODUCTS
 
-CACHE_TTL = 60 * 5 
-
-@method_decorator(cache_page(CACHE_TTL), name='list')
 class CategoryViewSet(ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
 
-    @method_decorator(cache_page(CACHE_TTL), name='list')
+    @cache_catalog_response(CATEGORIES)
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
@@ -35,20 +35,39 @@ class TagViewSet(ModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
 
-    @method_decorator(cache_page(CACHE_TTL), name='list')
+    @cache_catalog_response(TAGS)
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
 class ProductViewSet(ModelViewSet):
     serializer_class = ProductSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, ProductSearchFilter, ProductOrderingFilter]
     filterset_fields = ['category', 'tags', 'price']
-    search_fields = ['title', 'description']
-    ordering_fields = ['price', 'created_at']
+    ordering_fields = ['price', 'created_at', 'avg_rating', 'rating_count', 'favorite_count']
     pagination_class = ProductPagination
 
+    list_actions = ('list', 'featured', 'top_rated')
+
+    def get_serializer_class(self):
+        if self.action in self.list_actions:
+            return ProductListSerializer
+        return ProductSerializer
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        # Added after the shared per-audience cache, from the user's cached favorite set
+        # and the per-product favorite counts.
+        if self.action in self.list_actions and response.status_code == status.HTTP_200_OK:
+            favorites.apply_counts(response.data, fresh=response.get('X-Cache') != 'HIT')
+            favorites.mark_favorited(response.data, request.user)
+        return super().finalize_response(request, response, *args, **kwargs)
+
     def get_queryset(self):
-        return Product.objects.all().select_related('category', 'seller').prefetch_related('tags', 'reviews', 'flags')
+        queryset = Product.objects.all().select_related('category', 'seller').prefetch_related('tags')
+        if self.action in self.list_actions:
+            return queryset.visible_to(self.request.user).with_review_stats()
+        if self.action in ('reviews', 'download'):
+            return queryset
+        return queryset.prefetch_related('reviews__user', 'flags__user')
 
     def perform_create(self, serializer):
         user = self.request.user
@@ -77,48 +96,54 @@ class ProductViewSet(ModelViewSet):
             print(f"Error deleting product: {e}")
             raise serializers.ValidationError(f"Unable to delete product: {e}")
             
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
+    def owned(self, request):
+        return Response({'product_ids': sorted(entitlements.owned_ids(request.user))})
+
     @action(detail=True, methods=['get'])
     def download(self, request, pk=None):
         product = self.get_object()
         user = request.user
         
-        has_purchased = OrderItem.objects.filter(
-            order__user=user,
-            product=product,
-            order__payment_status='C'
-        ).exists()
-        
-        is_owner = product.seller == user
-        
-        is_admin = user.is_superuser or user.role == 'admin'
-        
-        if has_purchased or is_owner or is_admin:
-            file_path = product.file.path
-            if os.path.exists(file_path):
-                filename = os.path.basename(file_path)
-                response = FileResponse(open(file_path, 'rb'))
-                response['Content-Disposition'] = f'attachment; filename="{filename}"'
-                return response
-            else:
-                return HttpResponseNotFound('File not found')
+        is_owner = product.seller_id == user.pk
+        is_admin = user.is_superuser or getattr(user, 'role', None) == 'admin'
+        has_purchased = not (is_owner or is_admin) and entitlements.user_owns(user, product.pk)
+
+        if is_owner or is_admin or has_purchased:
+            return serve_file(request, product.file)
         else:
             return Response(
                 {"detail": "You have not purchased this product."},
                 status=status.HTTP_403_FORBIDDEN
             )
         
-    @method_decorator(cache_page(CACHE_TTL), name='list')
+    @cache_catalog_response(PRODUCTS, CATEGORIES, TAGS, per_audience=True)
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
     
 
-    @method_decorator(cache_page(CACHE_TTL), name='featured')
     @action(detail=False, methods=['get'])
+    @cache_catalog_response(PRODUCTS, CATEGORIES, TAGS, per_audience=True)
     def featured(self, request):
         featured_products = self.get_queryset().filter(is_featured=True)[:5]
         serializer = self.get_serializer(featured_products, many=True)
         return Response(serializer.data)
         
+    @action(detail=False, methods=['get'])
+    @cache_catalog_response(PRODUCTS, CATEGORIES, TAGS, per_audience=True)
+    def top_rated(self, request):
+        top_products = self.get_queryset().filter(rating_count__gt=0).order_by(F('avg_rating').desc(nulls_last=True), '-rating_count')[:10]
+        serializer = self.get_serializer(top_products, many=True)
+        return Response(serializer.data)
+
+    @action(detail=True, methods=['get'])
+    def reviews(self, request, pk=None):
+        product = self.get_object()
+        reviews = ProductReview.objects.filter(product=product).select_related('user').order_by('-created_at')
+        page = self.paginate_queryset(reviews)
+        serializer = ProductReviewSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
     @action(detail=True, methods=['patch'])
     def toggle_featured(self, request, pk=None):
         product = self.get_object()
@@ -166,31 +191,44 @@ class ProductViewSet(ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 class LatestProductsViewSet(ModelViewSet):
-    serializer_class = ProductSerializer
+    serializer_class = ProductListSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
-    @method_decorator(cache_page(CACHE_TTL), name='list')
+    @cache_catalog_response(PRODUCTS, CATEGORIES, TAGS, per_audience=True)
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
+    def finalize_response(self, request, response, *args, **kwargs):
+        if self.action == 'list' and response.status_code == status.HTTP_200_OK:
+            favorites.apply_counts(response.data, fresh=response.get('X-Cache') != 'HIT')
+        return super().finalize_response(request, response, *args, **kwargs)
+
     def get_queryset(self):
-        return Product.objects.all().select_related('category', 'seller')\
-                .prefetch_related('tags', 'reviews', 'flags').order_by('-created_at')[:5]
+        return Product.objects.visible_to(self.request.user).select_related('category', 'seller')\
+                .prefetch_related('tags').with_review_stats().order_by('-created_at')[:5]
 
 class ProductReviewViewSet(ModelViewSet):
-    queryset = ProductReview.objects.all()
+    queryset = ProductReview.objects.all().select_related('user')
     serializer_class = ProductReviewSerializer
+    filterset_fields = ['product']
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
     
 
 class ProductFlagViewSet(ModelViewSet):
-    queryset = ProductFlag.objects.all()
+    queryset = ProductFlag.objects.all().select_related('user')
     serializer_class = ProductFlagSerializer
 
     def perform_create(self, serializer):
         product = serializer.validated_data.get('product')
         if ProductFlag.objects.filter(user=self.request.user, product=product).exists():
             raise serializers.ValidationError("You have already flagged this product.")
-        serializer.save(user=self.request.user)
\ No newline at end of file
+        serializer.save(user=self.request.user)
+
+class CatalogCacheStatsView(APIView):
+    """Hit/miss counters for every cached catalog view."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(get_cache_stats())
@@ -19,9 +19,34 @@ PAYMOB_PUBLIC_KEY  = os.getenv("PAYMOB_PUBLIC_KEY")
 PAYMOB_MERCHANT_ID = os.getenv("PAYMOB_MERCHANT_ID")
 PAYMOB_INTEGRATION_ID = os.getenv("PAYMOB_INTEGRATION_ID")
 PAYMOB_IFRAME_ID  = os.getenv("PAYMOB_IFRAME_ID")
-PAYMOB_AUTH_URL = "https://accept.paymobsolutions.com/api/auth/tokens"
-PAYMOB_ORDER_URL = "https://accept.paymobsolutions.com/api/ecommerce/orders"
-PAYMOB_PAYMENT_KEY_URL= "https://accept.paymobsolutions.com/api/acceptance/payment_keys"
+PAYMOB_BASE_URL = os.getenv("PAYMOB_BASE_URL", "https://accept.paymobsolutions.com")
+# (connect, read) seconds per Paymob call; failed connects and 429/502/503/504 are retried with backoff.
+PAYMOB_TIMEOUT = (float(os.getenv("PAYMOB_CONNECT_TIMEOUT", "3.05")), float(os.getenv("PAYMOB_READ_TIMEOUT", "15")))
+PAYMOB_MAX_RETRIES = int(os.getenv("PAYMOB_MAX_RETRIES", "3"))
+# Paymob auth tokens live for an hour; reuse one until shortly before that.
+PAYMOB_TOKEN_TTL = int(os.getenv("PAYMOB_TOKEN_TTL", str(55 * 60)))
+# payments.log: share of INFO/DEBUG events kept, and lines per second per event name.
+PAYMOB_LOG_SAMPLE_RATE = float(os.getenv("PAYMOB_LOG_SAMPLE_RATE", "1.0"))
+PAYMOB_LOG_RATE_LIMIT = float(os.getenv("PAYMOB_LOG_RATE_LIMIT", "20"))
+
+# payments.log events go to stderr; PAYMOB_LOG_LEVEL=DEBUG adds the per-call Paymob steps.
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "payments": {"format": "{asctime} {levelname} {message}", "style": "{"},
+    },
+    "handlers": {
+        "payments": {"class": "logging.StreamHandler", "formatter": "payments"},
+    },
+    "loggers": {
+        "payments": {
+            "handlers": ["payments"],
+            "level": os.getenv("PAYMOB_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+    },
+}
 
 
 SECRET_KEY = 'django-insecure-)mx5num+p$9vtlb$+)n5022t7nx#&q57w7u1hqp6t&v4i6pr3y'
@@ -262,6 +287,13 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# How product downloads are delivered after the permission check:
+# 'django' streams from the app (Range/ETag aware), 'nginx' answers with X-Accel-Redirect
+# to PRODUCT_FILE_ACCEL_PREFIX (an `internal` location aliased to MEDIA_ROOT), and
+# 'sendfile' answers with X-Sendfile for Apache/lighttpd.
+PRODUCT_FILE_DELIVERY = os.getenv('PRODUCT_FILE_DELIVERY', 'django')
+PRODUCT_FILE_ACCEL_PREFIX = os.getenv('PRODUCT_FILE_ACCEL_PREFIX', '/protected-media/')
+
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
 # Optional but recommended
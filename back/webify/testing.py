@@ -0,0 +1,173 @@
+"""
+Shared dataset and assertions for the per-endpoint query budget tests.
+
+``seed_catalog`` builds a marketplace-sized dataset with bulk inserts; the size scales
+with the QUERY_BUDGET_SCALE environment variable (default 1: 2,000 products, about
+6,000 reviews and 600 orders). ``QueryBudgetTestCase.assertBudget`` requests an
+endpoint and fails when it runs more queries, or takes longer, than its budget.
+Budgets are absolute, so an N+1 shows up as soon as the seeded rows per user grow.
+"""
+import gc
+import os
+import random
+import time
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from accounts import favorites
+from accounts.models import Favorite, UserAccount, UserProfile
+from orders import rollups
+from orders.models import Cart, CartItem, Order, OrderItem, Subscription, SubscriptionPlan
+from products.models import Category, Product, ProductFlag, ProductReview, Tag
+from products.search import get_search_backend
+
+
+SCALE = float(os.getenv('QUERY_BUDGET_SCALE', '1'))
+LATENCY_FACTOR = float(os.getenv('QUERY_BUDGET_LATENCY_FACTOR', '1'))
+
+
+class CatalogDataset:
+    """Handles on the seeded rows that tests address directly."""
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def make_users(prefix, count, role='user', **extra):
+    users = UserAccount.objects.bulk_create([
+        UserAccount(
+            email=f'{prefix}{index}@example.com', first_name=prefix.title(), last_name=str(index),
+            name=f'{prefix.title()} {index}', role=role, is_active=True, password='!', **extra
+        )
+        for index in range(count)
+    ])
+    UserProfile.objects.bulk_create([UserProfile(user=user) for user in users])
+    return users
+
+
+def seed_catalog(scale=SCALE):
+    rng = random.Random(1234)
+    product_count = int(2000 * scale)
+    buyer_count = max(int(60 * scale), 10)
+    orders_per_buyer = 10
+
+    admin = make_users('admin', 1, role='admin', is_staff=True, is_superuser=True)[0]
+    sellers = make_users('seller', 20, role='seller')
+    buyers = make_users('buyer', buyer_count)
+
+    categories = Category.objects.bulk_create([
+        Category(name=f'Category {index}', slug=f'category-{index}') for index in range(12)
+    ])
+    tags = Tag.objects.bulk_create([Tag(name=f'tag-{index}') for index in range(30)])
+
+    products = Product.objects.bulk_create([
+        Product(
+            seller=sellers[index % len(sellers)],
+            title=f'Template {index} {rng.choice(["Dashboard", "Landing", "Shop", "Blog", "Portfolio"])}',
+            slug=f'template-{index}',
+            description='Responsive template with dark mode, charts and a component library.',
+            category=categories[index % len(categories)],
+            file=f'products/files/template-{index}.zip',
+            price=Decimal(rng.randint(5, 120)),
+            is_approved=index % 10 != 0,
+            is_featured=index % 97 == 0,
+        )
+        for index in range(product_count)
+    ])
+    Product.tags.through.objects.bulk_create([
+        Product.tags.through(product_id=product.pk, tag_id=tag.pk)
+        for product in products
+        for tag in rng.sample(tags, 3)
+    ])
+
+    reviews = []
+    flags = []
+    for product in products:
+        for buyer in rng.sample(buyers, 3):
+            reviews.append(ProductReview(product=product, user=buyer, rating=rng.randint(1, 5), comment='Solid.'))
+        if product.pk % 25 == 0:
+            flags.append(ProductFlag(product=product, user=buyers[0], reason='Broken demo link'))
+    ProductReview.objects.bulk_create(reviews)
+    ProductFlag.objects.bulk_create(flags)
+
+    orders = Order.objects.bulk_create([
+        Order(
+            user=buyer,
+            payment_status=Order.COMPLETE if index % 4 else Order.PENDING,
+            shipping_address='1 Test Street', city='Cairo', country='EG',
+        )
+        for buyer in buyers
+        for index in range(orders_per_buyer)
+    ])
+    OrderItem.objects.bulk_create([
+        OrderItem(order=order, product=product, price=product.price, quantity=1)
+        for order in orders
+        for product in rng.sample(products, 3)
+    ])
+
+    carts = Cart.objects.bulk_create([Cart(user=buyer) for buyer in buyers])
+    CartItem.objects.bulk_create([
+        CartItem(cart=cart, product=product, quantity=1)
+        for cart in carts
+        for product in rng.sample(products, 8)
+    ])
+    Favorite.objects.bulk_create([
+        Favorite(user=buyer, product=product)
+        for buyer in buyers
+        for product in rng.sample(products, 25)
+    ])
+
+    plan = SubscriptionPlan.objects.create(name='Pro', description='All templates', price=Decimal('19.00'), duration_days=30)
+    Subscription.objects.create(
+        user=buyers[0], plan=plan,
+        start_date='2025-01-01T00:00:00Z', end_date='2099-01-01T00:00:00Z',
+    )
+
+    # Bulk inserts skip signals, so derived data is rebuilt once here.
+    Product.objects.all().rebuild_review_stats()
+    favorites.rebuild_counts()
+    Order.objects.all().recalculate_totals()
+    rollups.rebuild()
+    get_search_backend().rebuild()
+
+    return CatalogDataset(
+        admin=admin, sellers=sellers, buyers=buyers, buyer=buyers[0], seller=sellers[0],
+        categories=categories, tags=tags, products=products, product=products[1],
+        order=orders[1], plan=plan,
+    )
+
+
+class QueryBudgetTestCase(APITestCase):
+    """APITestCase seeded once per class with ``seed_catalog``."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_catalog()
+
+    def setUp(self):
+        cache.clear()
+
+    def assertBudget(self, url, queries, ms=500, user=None, method='get', data=None, status=200):
+        """Request ``url`` and assert it stays within ``queries`` and ``ms`` milliseconds."""
+        self.client.force_authenticate(user)
+        # Collect the seed data's garbage now so a full collection doesn't land in the timing.
+        gc.collect()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = getattr(self.client, method)(url, data, format='json')
+            elapsed_ms = (time.perf_counter() - started) * 1000
+        self.assertEqual(response.status_code, status, f'{method.upper()} {url}: {response.status_code}')
+        self.assertLessEqual(
+            len(captured), queries,
+            f'{method.upper()} {url} ran {len(captured)} queries (budget {queries}):\n'
+            + '\n'.join(query['sql'] for query in captured.captured_queries)
+        )
+        self.assertLessEqual(
+            elapsed_ms, ms * LATENCY_FACTOR,
+            f'{method.upper()} {url} took {elapsed_ms:.0f}ms (budget {ms * LATENCY_FACTOR:.0f}ms)'
+        )
+        return response
@@ -12,6 +12,7 @@ export const ENDPOINTS = {
   CUSTOMERS: `${BASE_URL}/api/auth/customers/`,
   USER_DETAILS: `${BASE_URL}/api/auth/users/me/`,
   USER_PROFILE: `${BASE_URL}/api/auth/users/me/profile/`,
+  USER_ORDERS: `${BASE_URL}/api/auth/users/me/orders/`,
   FAVORITES: `${BASE_URL}/api/auth/favorites/`,
 
 
@@ -30,6 +31,7 @@ export const ENDPOINTS = {
   ORDERS: `${BASE_URL}/api/orders/`,
   ADMIN_ORDERS: `${BASE_URL}/api/admin/orders/`,
   SELLER_ORDERS: `${BASE_URL}/api/seller-orders/`, // New endpoint for seller orders
+  SELLER_SALES: `${BASE_URL}/api/seller-sales/`,
   ORDER_ITEMS: `${BASE_URL}/api/order-items/`,
   SUBSCRIPTION_PLANS: `${BASE_URL}/api/subscription-plans/`,
   SUBSCRIPTIONS: `${BASE_URL}/api/subscriptions/`,
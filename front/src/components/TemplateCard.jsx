@@ -19,13 +19,16 @@ const TemplateCard = (product) => {
     price,
     sale_price,
     reviews = [],
+    avg_rating,
+    review_count,
     photo,
     category_name,
-    tags_names = []
+    tags_names = [],
+    is_favorited = false
   } = product;
   
   // Debug image structure
-  const [isFavorite, setIsFavorite] = useState(false);
+  const [isFavorite, setIsFavorite] = useState(is_favorited);
   // Removed toast state variables as we're using SweetAlert instead
   const dispatch = useDispatch();
   const navigate = useNavigate();
@@ -148,9 +151,13 @@ const TemplateCard = (product) => {
     }
   };
 
-  const averageRating = reviews.length > 0 
-    ? (reviews.reduce((sum, review) => sum + review.rating, 0) / reviews.length).toFixed(1)
-    : 0;
+  // Listing endpoints send pre-aggregated stats; detail payloads still carry the reviews.
+  const reviewCount = review_count ?? reviews.length;
+  const averageRating = avg_rating != null
+    ? Number(avg_rating).toFixed(1)
+    : reviews.length > 0
+      ? (reviews.reduce((sum, review) => sum + review.rating, 0) / reviews.length).toFixed(1)
+      : 0;
 
   const renderStars = (rating) => {
     return [...Array(5)].map((_, index) => (
@@ -222,7 +229,7 @@ const TemplateCard = (product) => {
 
         <div className="mb-2 d-flex align-items-center">
           <span className="me-2">{renderStars(averageRating)}</span>
-          <small className="text-muted">({reviews.length} reviews)</small>
+          <small className="text-muted">({reviewCount} reviews)</small>
         </div>
 
         <Card.Text className="text-muted small mb-3" style={{ minHeight: '3rem', maxHeight: '3rem', overflow: 'hidden' }}>
@@ -7,6 +7,7 @@ import {
   deleteUserAccount,
   updateUserProfile,
   fetchUserFavorites,
+  fetchUserOrders,
 } from "../store/slices/usersSlice";
 import Swal from "sweetalert2";
 import { createProductReview } from "../store/slices/productsSlice";
@@ -43,6 +44,8 @@ export default function UserProfile() {
   const {
     userProfile,
     purchasedProducts = [],
+    userOrders = [],
+    userOrdersNext,
     userFavorites = [],
     loading,
     error,
@@ -71,6 +74,7 @@ export default function UserProfile() {
     const fetchUserData = async () => {
       try {
         await dispatch(fetchUserProfile()).unwrap();
+        await dispatch(fetchUserOrders()).unwrap();
         await dispatch(fetchUserFavorites()).unwrap();
       } catch (err) {
         console.error("Failed to fetch user data:", err);
@@ -391,7 +395,7 @@ export default function UserProfile() {
               >
                 <Badge bg="light" text="dark" className="me-2">
                   <FaShoppingCart className="me-1" size={12} />
-                  {purchasedProducts.length} Items
+                  {userProfile?.order_count ?? purchasedProducts.length} Items
                 </Badge>
                 <Badge bg="light" text="dark">
                   <FaStar className="me-1" size={12} />
@@ -461,7 +465,7 @@ export default function UserProfile() {
                   <FaShoppingCart className="text-primary me-3" size={18} />
                   <div>
                     <small className="text-muted">Items Purchased</small>
-                    <p className="mb-0 fw-bold">{purchasedProducts.length}</p>
+                    <p className="mb-0 fw-bold">{userProfile?.order_count ?? purchasedProducts.length}</p>
                   </div>
                 </div>
               </Card.Body>
@@ -517,8 +521,8 @@ export default function UserProfile() {
                       <h5 className="mb-0">Your Purchased Items</h5>
                     </div>
 
-                    {userProfile?.orders?.length > 0 ? (
-                      userProfile.orders.map((order) => (
+                    {userOrders.length > 0 ? (
+                      userOrders.map((order) => (
                         <div
                           key={order.id}
 
@@ -671,6 +675,16 @@ export default function UserProfile() {
                         </Button>
                       </div>
                     )}
+                    {userOrdersNext && (
+                      <div className="text-center mt-3">
+                        <Button
+                          variant="outline-primary"
+                          onClick={() => dispatch(fetchUserOrders(userOrdersNext))}
+                        >
+                          Load more orders
+                        </Button>
+                      </div>
+                    )}
                   </>
                 )}
               </Card.Body>
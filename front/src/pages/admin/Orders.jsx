@@ -1,77 +1,68 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useCallback } from 'react';
 import { FaEye, FaFilter, FaDownload } from 'react-icons/fa';
 import DataTable from '../../components/Admin/DataTable';
 import axios from 'axios';
-import { BASE_URL, ENDPOINTS } from '../../api/constants';
+import { ENDPOINTS } from '../../api/constants';
 import Swal from 'sweetalert2';
 
 const Orders = () => {
   const [orders, setOrders] = useState([]);
+  const [nextUrl, setNextUrl] = useState(null);
+  const [totalCount, setTotalCount] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [showOrderDetails, setShowOrderDetails] = useState(false);
   const [currentOrder, setCurrentOrder] = useState(null);
   const [filterStatus, setFilterStatus] = useState('');
+  const [createdAfter, setCreatedAfter] = useState('');
+  const [createdBefore, setCreatedBefore] = useState('');
+  const [filterUser, setFilterUser] = useState('');
   const [error, setError] = useState(null);
 
   // Helper function to get auth header
   // Using cookie-based auth; axios will send cookies automatically (withCredentials=true)
 
-  useEffect(() => {
-    // Fetch all orders from the database for admin dashboard
-    const fetchOrders = async () => {
-      try {
+  // Load one cursor page of orders. Without `next` it starts over with the current
+  // filters, which the API applies; `next` already carries the cursor and the filters.
+  const fetchOrders = useCallback(async (next = null) => {
+    try {
+      if (next) {
+        setLoadingMore(true);
+      } else {
         setLoading(true);
-        setError(null);
-        
-        // First try to fetch orders directly from Django admin API
-        try {
-          // This approach uses Django admin API directly
-          const response = await axios.get(ENDPOINTS.ADMIN_ORDERS);
-          
-          // Ensure we have an array to work with
-          const ordersData = Array.isArray(response.data) 
-            ? response.data 
-            : response.data.results || [];
-          
-          setOrders(ordersData);
-          setLoading(false);
-          return; // Exit if successful
-        } catch (adminError) {
-          // Continue to fallback approach
+      }
+      setError(null);
+
+      const response = await axios.get(next || ENDPOINTS.ADMIN_ORDERS, {
+        params: next ? undefined : {
+          status: filterStatus || undefined,
+          created_after: createdAfter || undefined,
+          created_before: createdBefore || undefined,
+          user: filterUser || undefined,
+          count: true
         }
-        
-        // Fallback: Try to fetch all orders using regular API
-        // This will only work if the user has admin permissions
-        const response = await axios.get(ENDPOINTS.ADMIN_ORDERS);
-        
-        // Ensure we have an array to work with
-        const ordersData = Array.isArray(response.data) 
-          ? response.data 
-          : response.data.results || [];
-        
-        // If we need to fetch order details for each order
-        const ordersWithDetails = await Promise.all(
-          ordersData.map(async (order) => {
-            try {
-              const detailsResponse = await axios.get(`${ENDPOINTS.ADMIN_ORDERS}/${order.id}/`);
-              return detailsResponse.data;
-            } catch (error) {
-              return order; // Return the original order if details fetch fails
-            }
-          })
-        );
-        
-        setOrders(ordersWithDetails);
-        setLoading(false);
-      } catch (error) {
-        setError('Failed to fetch orders. Make sure you have admin permissions.');
+      });
+      const { results = [], next: following = null, count } = response.data;
+
+      setOrders(previous => (next ? [...previous, ...results] : results));
+      setNextUrl(following);
+      if (!next) {
+        setTotalCount(count ?? null);
+      }
+    } catch (error) {
+      setError('Failed to fetch orders. Make sure you have admin permissions.');
+      if (!next) {
         setOrders([]);
-        setLoading(false);
       }
-    };
+    } finally {
+      setLoading(false);
+      setLoadingMore(false);
+    }
+  }, [filterStatus, createdAfter, createdBefore, filterUser]);
 
+  useEffect(() => {
     fetchOrders();
-  }, []);
+  }, [fetchOrders]);
 
   // Format currency
   const formatCurrency = (value) => {
@@ -91,15 +82,24 @@ const Orders = () => {
         return { text: 'Pending', badgeClass: 'badge-warning' };
       case 'X':
         return { text: 'Canceled', badgeClass: 'badge-danger' };
+      case 'F':
+        return { text: 'Failed', badgeClass: 'badge-danger' };
       default:
         return { text: 'Unknown', badgeClass: 'badge-secondary' };
     }
   };
 
   // Handle view order details
-  const handleViewOrder = (order) => {
+  const handleViewOrder = async (order) => {
     setCurrentOrder(order);
     setShowOrderDetails(true);
+    // List rows are summaries; load the items for the modal
+    try {
+      const response = await axios.get(`${ENDPOINTS.ADMIN_ORDERS}${order.id}/`);
+      setCurrentOrder(response.data);
+    } catch (error) {
+      // Keep showing the summary row
+    }
   };
 
   // Handle status change
@@ -159,10 +159,8 @@ const Orders = () => {
     }, 0);
   };
 
-  // Filter orders by status
-  const filteredOrders = filterStatus 
-    ? orders.filter(order => order.payment_status === filterStatus)
-    : orders;
+  // Orders arrive already filtered by the API
+  const filteredOrders = orders;
 
   // Table columns
   const columns = [
@@ -211,7 +209,8 @@ const Orders = () => {
     }
   ];
 
-  if (loading) {
+  // Filter changes reload in place; the spinner is only for the first load
+  if (loading && orders.length === 0) {
     return (
       <div className="content">
         <div className="container-fluid">
@@ -276,12 +275,12 @@ const Orders = () => {
       <section className="content">
         <div className="container-fluid">
           <div className="row mb-3">
-            <div className="col-md-8">
+            <div className="col-md-3">
               <button className="btn btn-success">
                 <FaDownload className="mr-1" /> Export Orders
               </button>
             </div>
-            <div className="col-md-4">
+            <div className="col-md-9">
               <div className="input-group">
                 <select 
                   className="form-control" 
@@ -292,11 +291,34 @@ const Orders = () => {
                   <option value="P">Pending</option>
                   <option value="C">Completed</option>
                   <option value="X">Canceled</option>
+                  <option value="F">Failed</option>
                 </select>
+                <input
+                  type="date"
+                  className="form-control"
+                  title="Created on or after"
+                  value={createdAfter}
+                  onChange={(e) => setCreatedAfter(e.target.value)}
+                />
+                <input
+                  type="date"
+                  className="form-control"
+                  title="Created before"
+                  value={createdBefore}
+                  onChange={(e) => setCreatedBefore(e.target.value)}
+                />
+                <input
+                  type="number"
+                  min="1"
+                  className="form-control"
+                  placeholder="Customer ID"
+                  value={filterUser}
+                  onChange={(e) => setFilterUser(e.target.value)}
+                />
                 <div className="input-group-append">
-                  <button className="btn btn-outline-secondary" type="button">
+                  <span className="input-group-text">
                     <FaFilter />
-                  </button>
+                  </span>
                 </div>
               </div>
             </div>
@@ -306,7 +328,7 @@ const Orders = () => {
             <div className="col-12">
               <div className="card">
                 <div className="card-header">
-                  <h3 className="card-title">All Orders ({orders.length})</h3>
+                  <h3 className="card-title">All Orders ({totalCount ?? orders.length})</h3>
                 </div>
                 <div className="card-body table-responsive p-0">
                   {orders.length > 0 ? (
@@ -321,6 +343,17 @@ const Orders = () => {
                       No orders found. Orders created in Django admin may not appear here due to API restrictions.
                     </div>
                   )}
+                  {nextUrl && (
+                    <div className="text-center m-3">
+                      <button
+                        className="btn btn-outline-primary"
+                        onClick={() => fetchOrders(nextUrl)}
+                        disabled={loadingMore}
+                      >
+                        {loadingMore ? 'Loading...' : 'Load more orders'}
+                      </button>
+                    </div>
+                  )}
                 </div>
               </div>
             </div>
@@ -15,7 +15,7 @@ export default function Orders() {
   const [isUpdatingStatus, setIsUpdatingStatus] = useState(null);
 
   // Get data from Redux store
-  const { items: orders, loading, error } = useSelector(state => state.sellerOrders);
+  const { items: orders, next, loading, loadingMore, error } = useSelector(state => state.sellerOrders);
   const { user } = useSelector(state => state.auth);
 
   // Load user data if not already loaded
@@ -25,13 +25,16 @@ export default function Orders() {
     }
   }, [dispatch, user]);
 
-  // Load seller orders from backend
+  // Load the first page of seller orders; the status filter is applied by the API
   useEffect(() => {
     if (user && user.id) {
-      console.log('Dispatching fetchSellerOrders for user:', user.id);
-      dispatch(fetchSellerOrders());
+      dispatch(fetchSellerOrders({ status: statusFilter === "all" ? null : statusFilter }));
     }
-  }, [dispatch, user]);
+  }, [dispatch, user, statusFilter]);
+
+  const handleLoadMore = () => {
+    dispatch(fetchSellerOrders({ nextUrl: next }));
+  };
   
   // Debug log orders
   useEffect(() => {
@@ -47,16 +50,8 @@ export default function Orders() {
     }
   }, [orders]);
 
-  // Make sure orders is an array before filtering
-  const filteredOrders = Array.isArray(orders) 
-    ? orders.filter(order => 
-        statusFilter === "all" || 
-        (order.payment_status === statusFilter.charAt(0).toUpperCase())
-      )
-    : [];
-    
-  console.log('Filtered orders by status:', filteredOrders);
-  console.log('Filtered orders length:', filteredOrders.length);
+  // Orders arrive already filtered by status
+  const filteredOrders = Array.isArray(orders) ? orders : [];
 
   const handleUpdateOrderStatus = async (orderId, newStatus) => {
     setIsUpdatingStatus(orderId);
@@ -128,8 +123,9 @@ export default function Orders() {
             >
               <option value="all">All Statuses</option>
               <option value="P">Processing</option>
-              <option value="S">Shipped</option>
               <option value="C">Completed</option>
+              <option value="X">Canceled</option>
+              <option value="F">Failed</option>
             </select>
           </div>
         </div>
@@ -173,7 +169,7 @@ export default function Orders() {
                 total: new Intl.NumberFormat('en-US', {
                   style: 'currency',
                   currency: 'USD'
-                }).format(order.total || 0),
+                }).format(order.seller_subtotal ?? order.total ?? 0),
                 status: (
                   <span className={`status-badge ${
                     (order.payment_status === 'C') ? 'status-completed' :
@@ -194,6 +190,17 @@ export default function Orders() {
               {console.log('No orders to display in UI')}
             </div>
           )}
+          {next && (
+            <div className="text-center mt-3">
+              <button
+                className="btn btn-outline-primary"
+                onClick={handleLoadMore}
+                disabled={loadingMore}
+              >
+                {loadingMore ? 'Loading...' : 'Load more orders'}
+              </button>
+            </div>
+          )}
         </div>
       </main>
     </div>
@@ -211,12 +211,13 @@ export const createOrder = createAsyncThunk(
 
 export const fetchOrders = createAsyncThunk(
   'cartApi/fetchOrders',
-  async (_, { rejectWithValue }) => {
+  async (nextUrl = null, { rejectWithValue }) => {
     try {
-      const response = await axios.get(`${BASE_URL}/api/orders/`, {
+      // One cursor page; pass the previous page's `next` to load the following one
+      const response = await axios.get(nextUrl || `${BASE_URL}/api/orders/`, {
         headers: getAuthHeader()
       });
-      return response.data;
+      return { ...response.data, append: Boolean(nextUrl) };
     } catch (error) {
       return rejectWithValue(error.response?.data || 'Failed to fetch orders');
     }
@@ -24,8 +24,8 @@ export const fetchDashboardStats = createAsyncThunk(
         headers: getAuthHeader()
       });
       
-      // Get orders
-      const ordersResponse = await axios.get(ENDPOINTS.ORDERS, {
+      // Sales totals and the pending count are aggregated by the API
+      const totalsResponse = await axios.get(`${ENDPOINTS.SELLER_SALES}totals/`, {
         headers: getAuthHeader()
       });
       
@@ -47,110 +47,13 @@ export const fetchDashboardStats = createAsyncThunk(
           (product.user && product.user.id && String(product.user.id) === sellerIdStr)
         );
       });
-      const sellerProductIds = products.map(p => p.id);
-      
-      // Filter orders by seller ID manually
-      const allOrders = ordersResponse.data?.results || ordersResponse.data || [];
-      const orders = allOrders.filter(order => {
-        // Check if order has items that contain products from this seller
-        if (order.items && Array.isArray(order.items)) {
-          return order.items.some(item => {
-            const productId = item.product_id || (item.product && item.product.id);
-            return sellerProductIds.includes(productId);
-          });
-        }
-        return false;
-      });
       
       // Count total products
       const totalProducts = products.length;
       
-      // Calculate total sales as the sum of all order item prices
-      let totalSales = 0;
-      
-      // Loop through each order to calculate total sales
-      orders.forEach(order => {
-        try {
-          // Check if order has items
-          if (order.items && Array.isArray(order.items)) {
-            // Loop through each item in the order
-            order.items.forEach(item => {
-              try {
-                // Get the product ID
-                const productId = item.product_id || (item.product && item.product.id) || item.product;
-                
-                // Check if this item's product belongs to the seller
-                if (sellerProductIds.includes(productId)) {
-                  // Get the item price
-                  let itemPrice = 0;
-                  if (item.price) {
-                    itemPrice = typeof item.price === 'string' ? parseFloat(item.price) : item.price;
-                  } else if (item.product && item.product.price) {
-                    itemPrice = typeof item.product.price === 'string' ? parseFloat(item.product.price) : item.product.price;
-                  }
-                  
-                  // Get the quantity
-                  const quantity = item.quantity || 1;
-                  
-                  // Add to total sales
-                  totalSales += itemPrice * quantity;
-                }
-              } catch (itemError) {
-                console.log('Error processing order item:', itemError);
-              }
-            });
-          } else if (order.order_items && Array.isArray(order.order_items)) {
-            // Process order_items instead
-            order.order_items.forEach(item => {
-              try {
-                // Get the product ID
-                const productId = item.product_id || (item.product && item.product.id) || item.product;
-                
-                // Check if this item's product belongs to the seller
-                if (sellerProductIds.includes(productId)) {
-                  // Get the item price
-                  let itemPrice = 0;
-                  if (item.price) {
-                    itemPrice = typeof item.price === 'string' ? parseFloat(item.price) : item.price;
-                  } else if (item.product && item.product.price) {
-                    itemPrice = typeof item.product.price === 'string' ? parseFloat(item.product.price) : item.product.price;
-                  }
-                  
-                  // Get the quantity
-                  const quantity = item.quantity || 1;
-                  
-                  // Add to total sales
-                  totalSales += itemPrice * quantity;
-                }
-              } catch (itemError) {
-                console.log('Error processing order item:', itemError);
-              }
-            });
-          } else if (order.total) {
-            // If order has a total field, use that as a fallback
-            const orderTotal = typeof order.total === 'string' ? parseFloat(order.total) : order.total;
-            
-            // Check if any product in this order belongs to the seller
-            const belongsToSeller = sellerProductIds.some(id => {
-              return order.product_id === id || (order.product && order.product.id === id);
-            });
-            
-            if (belongsToSeller) {
-              totalSales += orderTotal;
-            }
-          }
-        } catch (orderError) {
-          console.log('Error processing order:', orderError);
-        }
-      });
-      
-      // Format totalSales to 2 decimal places
-      totalSales = parseFloat(totalSales.toFixed(2));
-      
-      // Count pending orders
-      const pendingOrders = orders.filter(order => 
-        order.status === 'P' || order.status === 'Pending' || order.status === 'Processing'
-      ).length;
+      const totals = totalsResponse.data;
+      const totalSales = parseFloat(totals.gross_revenue) || 0;
+      const pendingOrders = totals.pending_orders || 0;
       
       return {
         total_sales: totalSales,
@@ -176,54 +79,17 @@ export const fetchMonthlySales = createAsyncThunk(
         return rejectWithValue('User ID not found. Please log in again.');
       }
 
-      // Get all orders
-      const ordersResponse = await axios.get(ENDPOINTS.ORDERS, {
-        headers: getAuthHeader()
-      });
-      
-      // Get all products to identify seller's products
-      const productsResponse = await axios.get(ENDPOINTS.PRODUCTS, {
-        headers: getAuthHeader()
-      });
-      
-      // Filter products by seller ID
-      const allProducts = productsResponse.data?.results || productsResponse.data || [];
-      
-      const sellerProducts = allProducts.filter(product => {
-        // Convert IDs to strings for comparison to handle both number and string IDs
-        const sellerIdStr = String(sellerId);
-        
-        // Check all possible fields where seller ID might be stored
-        return (
-          (product.seller && String(product.seller) === sellerIdStr) || 
-          (product.seller_id && String(product.seller_id) === sellerIdStr) ||
-          (product.user && String(product.user) === sellerIdStr) ||
-          (product.user_id && String(product.user_id) === sellerIdStr) ||
-          // Also check nested objects
-          (product.seller && product.seller.id && String(product.seller.id) === sellerIdStr) ||
-          (product.user && product.user.id && String(product.user.id) === sellerIdStr)
-        );
-      });
-      
-      // Get product IDs belonging to this seller
-      const sellerProductIds = sellerProducts.map(p => p.id);
-      
-      // Filter orders that contain products from this seller
-      const allOrders = ordersResponse.data?.results || ordersResponse.data || [];
-      const orders = allOrders.filter(order => {
-        if (order.items && Array.isArray(order.items)) {
-          return order.items.some(item => {
-            const productId = item.product_id || (item.product && item.product.id);
-            return sellerProductIds.includes(productId);
-          });
-        }
-        return false;
-      });
-      
-      // Generate sample monthly data based on real orders
       const currentDate = new Date();
       const monthNames = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'];
       
+      // Daily sales rollups from the first day of the month five months back
+      const since = new Date(currentDate.getFullYear(), currentDate.getMonth() - 5, 1);
+      const pad = (value) => String(value).padStart(2, '0');
+      const dailyResponse = await axios.get(`${ENDPOINTS.SELLER_SALES}daily/`, {
+        headers: getAuthHeader(),
+        params: { day__gte: `${since.getFullYear()}-${pad(since.getMonth() + 1)}-01` }
+      });
+      
       // Create a map of months with sales data
       const monthlySalesMap = {};
       
@@ -233,18 +99,11 @@ export const fetchMonthlySales = createAsyncThunk(
         monthlySalesMap[monthNames[monthIndex]] = 0;
       }
       
-      // Aggregate order data by month
-      orders.forEach(order => {
-        if (order.created_at) {
-          const orderDate = new Date(order.created_at);
-          const monthName = monthNames[orderDate.getMonth()];
-          
-          // Only count orders from the last 6 months
-          const monthsDiff = (currentDate.getMonth() - orderDate.getMonth() + 12) % 12;
-          if (monthsDiff < 6) {
-            const orderTotal = order.total || 0;
-            monthlySalesMap[monthName] += (typeof orderTotal === 'string' ? parseFloat(orderTotal) : orderTotal);
-          }
+      // Add each day's revenue to its month
+      (dailyResponse.data || []).forEach(row => {
+        const monthName = monthNames[Number(row.day.slice(5, 7)) - 1];
+        if (monthName in monthlySalesMap) {
+          monthlySalesMap[monthName] += parseFloat(row.gross_revenue) || 0;
         }
       });
       
@@ -325,86 +184,21 @@ export const fetchRecentOrders = createAsyncThunk(
         return rejectWithValue('User ID not found. Please log in again.');
       }
 
-      // Get all orders and products
-      const ordersResponse = await axios.get(ENDPOINTS.ORDERS, {
-        headers: getAuthHeader()
-      });
-      
-      const productsResponse = await axios.get(ENDPOINTS.PRODUCTS, {
-        headers: getAuthHeader()
-      });
-      
-      // Filter products by seller ID
-      const allProducts = productsResponse.data?.results || productsResponse.data || [];
-      
-      const sellerProducts = allProducts.filter(product => {
-        // Convert IDs to strings for comparison to handle both number and string IDs
-        const sellerIdStr = String(sellerId);
-        
-        // Check all possible fields where seller ID might be stored
-        return (
-          (product.seller && String(product.seller) === sellerIdStr) || 
-          (product.seller_id && String(product.seller_id) === sellerIdStr) ||
-          (product.user && String(product.user) === sellerIdStr) ||
-          (product.user_id && String(product.user_id) === sellerIdStr) ||
-          // Also check nested objects
-          (product.seller && product.seller.id && String(product.seller.id) === sellerIdStr) ||
-          (product.user && product.user.id && String(product.user.id) === sellerIdStr)
-        );
-      });
-      
-      // Get product IDs belonging to this seller
-      const sellerProductIds = sellerProducts.map(p => p.id);
-      
-      // Get all orders
-      const allOrders = ordersResponse.data?.results || ordersResponse.data || [];
-      
-      // Filter orders that might be related to this seller
-      const sellerOrders = allOrders.filter(order => {
-        try {
-          // Check if order has items array and any item contains a product from this seller
-          if (order.items && Array.isArray(order.items)) {
-            return order.items.some(item => {
-              const productId = item.product_id || (item.product && item.product.id) || item.product;
-              return sellerProductIds.includes(productId);
-            });
-          }
-          
-          // Check if order has order_items array and any item contains a product from this seller
-          if (order.order_items && Array.isArray(order.order_items)) {
-            return order.order_items.some(item => {
-              const productId = item.product_id || (item.product && item.product.id) || item.product;
-              return sellerProductIds.includes(productId);
-            });
-          }
-          
-          // Check if order directly references a product that belongs to this seller
-          if (order.product_id && sellerProductIds.includes(order.product_id)) {
-            return true;
-          }
-          
-          if (order.product && order.product.id && sellerProductIds.includes(order.product.id)) {
-            return true;
-          }
-          
-          return false;
-        } catch (error) {
-          console.log('Error filtering order:', error);
-          return false;
-        }
+      // The seller feed is newest first, so its first page holds the recent orders
+      const ordersResponse = await axios.get(ENDPOINTS.SELLER_ORDERS, {
+        headers: getAuthHeader(),
+        params: { page_size: 5 }
       });
       
-      // Get the 5 most recent orders
-      const recentOrders = sellerOrders
-        .sort((a, b) => new Date(b.created_at || b.date || Date.now()) - new Date(a.created_at || a.date || Date.now()))
-        .slice(0, 5)
-        .map(order => ({
-          id: order.id,
-          customer: order.first_name ? `${order.first_name} ${order.last_name || ''}` : 'Customer',
-          date: order.created_at ? new Date(order.created_at).toLocaleDateString() : 'Unknown date',
-          amount: order.total || 0,
-          status: getOrderStatus(order.status)
-        }));
+      const recentOrders = (ordersResponse.data?.results || []).map(order => ({
+        id: order.id,
+        customer: order.user
+          ? `${order.user.first_name || ''} ${order.user.last_name || ''}`.trim() || 'Customer'
+          : 'Customer',
+        date: order.created_at ? new Date(order.created_at).toLocaleDateString() : 'Unknown date',
+        amount: order.seller_subtotal || 0,
+        status: getOrderStatus(order.payment_status)
+      }));
       
       return recentOrders;
     } catch (error) {
@@ -419,7 +213,9 @@ function getOrderStatus(statusCode) {
     'P': 'Processing',
     'S': 'Shipped',
     'D': 'Delivered',
-    'C': 'Completed'
+    'C': 'Completed',
+    'X': 'Canceled',
+    'F': 'Failed'
   };
   
   return statusMap[statusCode] || statusCode || 'Processing';
@@ -18,10 +18,11 @@ export const fetchCart = createAsyncThunk(
 
 export const fetchOrders = createAsyncThunk(
   'orders/fetchAll',
-  async (_, { rejectWithValue }) => {
+  async (nextUrl = null, { rejectWithValue }) => {
     try {
-      const response = await axios.get(ENDPOINTS.ORDERS);
-      return response.data;
+      // One cursor page; pass the previous page's `next` to append the following one
+      const response = await axios.get(nextUrl || ENDPOINTS.ORDERS);
+      return { ...response.data, append: Boolean(nextUrl) };
     } catch (error) {
       return rejectWithValue(
         error.response ? error.response.data : 'Could not fetch orders'
@@ -94,6 +95,7 @@ const ordersSlice = createSlice({
       total: 0,
     },
     orders: [],
+    ordersNext: null,
     subscriptions: [],
     loading: false,
     error: null,
@@ -134,8 +136,10 @@ const ordersSlice = createSlice({
         state.error = null;
       })
       .addCase(fetchOrders.fulfilled, (state, action) => {
+        const { results = [], next = null, append } = action.payload;
         state.loading = false;
-        state.orders = action.payload;
+        state.orders = append ? [...state.orders, ...results] : results;
+        state.ordersNext = next;
       })
       .addCase(fetchOrders.rejected, (state, action) => {
         state.loading = false;
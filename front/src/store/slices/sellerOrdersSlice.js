@@ -5,10 +5,11 @@ import { ENDPOINTS } from '../../api/constants';
 // No-op auth header - cookies will be sent automatically by axios
 const getAuthHeader = () => ({});
 
-// Fetch all orders for the seller
+// Fetch one page of the seller's orders. Pass `nextUrl` (the previous page's `next`)
+// to append the following page; `status` filters on the server.
 export const fetchSellerOrders = createAsyncThunk(
   'sellerOrders/fetchAll',
-  async (_, { rejectWithValue, getState }) => {
+  async ({ nextUrl = null, status = null } = {}, { rejectWithValue, getState }) => {
     try {
       // Get the current user from state
       const { auth } = getState();
@@ -18,17 +19,13 @@ export const fetchSellerOrders = createAsyncThunk(
         return rejectWithValue('User ID not found. Please log in again.');
       }
       
-      console.log('Fetching seller orders for seller ID:', sellerId);
-      
-      // Fetch all orders directly
-      const ordersResponse = await axios.get(ENDPOINTS.SELLER_ORDERS, {
-        headers: getAuthHeader()
+      // The feed is cursor-paginated; `next` already carries the cursor and the filters
+      const response = await axios.get(nextUrl || ENDPOINTS.SELLER_ORDERS, {
+        headers: getAuthHeader(),
+        params: nextUrl ? undefined : { status: status || undefined }
       });
       
-      console.log('All orders from API:', ordersResponse.data);
-      
-      // Return the raw orders data
-      return ordersResponse.data || [];
+      return { ...response.data, append: Boolean(nextUrl) };
     } catch (error) {
       console.error('Error fetching seller orders:', error);
       return rejectWithValue(
@@ -67,7 +64,9 @@ const sellerOrdersSlice = createSlice({
   name: 'sellerOrders',
   initialState: {
     items: [],
+    next: null,
     loading: false,
+    loadingMore: false,
     error: null,
     success: null,
   },
@@ -87,16 +86,25 @@ const sellerOrdersSlice = createSlice({
   extraReducers: (builder) => {
     builder
       // Fetch All Seller Orders
-      .addCase(fetchSellerOrders.pending, (state) => {
-        state.loading = true;
+      .addCase(fetchSellerOrders.pending, (state, action) => {
+        // Appending a page keeps the loaded orders on screen
+        if (action.meta.arg?.nextUrl) {
+          state.loadingMore = true;
+        } else {
+          state.loading = true;
+        }
         state.error = null;
       })
       .addCase(fetchSellerOrders.fulfilled, (state, action) => {
+        const { results = [], next = null, append } = action.payload;
         state.loading = false;
-        state.items = action.payload;
+        state.loadingMore = false;
+        state.items = append ? [...state.items, ...results] : results;
+        state.next = next;
       })
       .addCase(fetchSellerOrders.rejected, (state, action) => {
         state.loading = false;
+        state.loadingMore = false;
         state.error = action.payload || 'Failed to fetch seller orders';
       })
       
@@ -14,6 +14,8 @@ const initialState = {
   userDetails: null,
   userProfile: null,
   purchasedProducts: [],
+  userOrders: [],
+  userOrdersNext: null,
   userFavorites: [],
   usersList: [], // Added for storing all users
   loading: false,
@@ -73,6 +75,19 @@ export const fetchUserProfile = createAsyncThunk(
   }
 );
 
+// Orders are paged separately from the profile; pass the `next` URL to load more
+export const fetchUserOrders = createAsyncThunk(
+  'users/fetchOrders',
+  async (nextUrl = null, { rejectWithValue }) => {
+    try {
+      const response = await api.get(nextUrl || ENDPOINTS.USER_ORDERS);
+      return { ...response.data, append: Boolean(nextUrl) };
+    } catch (error) {
+      return rejectWithValue(error.response?.data?.message || 'Failed to fetch orders');
+    }
+  }
+);
+
 export const updateUserProfile = createAsyncThunk(
   'users/updateProfile',
   async (profileData, { rejectWithValue }) => {
@@ -155,7 +170,18 @@ const usersSlice = createSlice({
       .addCase(fetchUserProfile.fulfilled, (state, action) => {
         state.loading = false;
         state.userProfile = action.payload;
-        state.purchasedProducts = action.payload.orders?.map(order => ({
+        state.success = 'Profile fetched successfully';
+      })
+      .addCase(fetchUserProfile.rejected, (state, action) => {
+        state.loading = false;
+        state.error = action.payload;
+      })
+
+      .addCase(fetchUserOrders.fulfilled, (state, action) => {
+        const { results = [], next = null, append } = action.payload;
+        state.userOrders = append ? [...state.userOrders, ...results] : results;
+        state.userOrdersNext = next;
+        state.purchasedProducts = state.userOrders.map(order => ({
           id: order.id,
           title: order.items[0]?.product?.title,
           image: order.items[0]?.product?.preview_image,
@@ -165,12 +191,7 @@ const usersSlice = createSlice({
           price: order.total_amount,
           downloads: order.downloads || 0,
           rating: order.items[0]?.product?.average_rating || 0
-        })) || [];
-        state.success = 'Profile fetched successfully';
-      })
-      .addCase(fetchUserProfile.rejected, (state, action) => {
-        state.loading = false;
-        state.error = action.payload;
+        }));
       })
 
       // Handle fetchUsers